@@ -1,5 +1,11 @@
+import importlib
+
 import streamlit as st
 
+import instrumentation
+import partitions
+from instrumentation import stage
+
 # =========================
 # PAGE CONFIG
 # =========================
@@ -83,18 +89,34 @@ st.sidebar.markdown(
     unsafe_allow_html=True
 )
 
-menu = st.sidebar.radio(
-    "",
-    [
-        "📊 About Dataset",
-        "📈 Dashboard",
-        "🤖 Machine Learning",
-        "🔮 Prediction App",
-        "📬 Contact Me"
-    ]
-)
+# Modul halaman di-import saat dibuka saja, sehingga startup dan halaman
+# ringan (mis. Prediction) tidak ikut memuat pandas / plotly / sklearn
+# (modul, fungsi, butuh partisi dataset)
+PAGES = {
+    "📊 About Dataset": ("about", "about_dataset", False),
+    "📈 Dashboard": ("visualisasi", "chart", True),
+    "🤖 Machine Learning": ("machine_learning", "ml_model", True),
+    "🔮 Prediction App": ("prediction", "prediction_app", True),
+    "📬 Contact Me": ("kontak", "contact_me", False),
+}
+
+menu = st.sidebar.radio("", list(PAGES))
+
+# Pilihan dataset (source / varietal / vintage). Hanya daftar folder yang
+# dibaca di sini; data & artifact partisi dimuat oleh halaman saat dibutuhkan.
+available = {p.id: p for p in partitions.discover()}
+partition = None
+if len(available) > 1:
+    partition_id = st.sidebar.selectbox(
+        "🗂️ Dataset", list(available), format_func=lambda pid: available[pid].label, key="partition"
+    )
+    partition = available[partition_id]
 
 st.sidebar.markdown("---")
+# Diagnostics per stage (wall/CPU/memori); default dari env WINE_DIAGNOSTICS=1
+diagnostics = st.sidebar.toggle("🩺 Diagnostics", value=instrumentation.ENABLED_DEFAULT)
+instrumentation.configure(diagnostics)
+
 st.sidebar.markdown("""
 <div style="color:white;">
     <b>Wine Quality Prediction</b><br>
@@ -124,22 +146,13 @@ st.markdown("""
 # =========================
 # CONTENT ROUTING
 # =========================
-if menu == "📊 About Dataset":
-    import about
-    about.about_dataset()
-
-elif menu == "📈 Dashboard":
-    import visualisasi
-    visualisasi.chart()
-
-elif menu == "🤖 Machine Learning":
-    import machine_learning
-    machine_learning.ml_model()
-
-elif menu == "🔮 Prediction App":
-    import prediction
-    prediction.prediction_app()
-
-elif menu == "📬 Contact Me":
-    import kontak
-    kontak.contact_me()
+page_module, page_fn, uses_partition = PAGES[menu]
+with stage(f"page:{menu}"):
+    page = getattr(importlib.import_module(page_module), page_fn)
+    if uses_partition:
+        page(partition)
+    else:
+        page()
+
+if diagnostics:
+    instrumentation.render_panel(page_module)
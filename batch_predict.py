@@ -0,0 +1,71 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import scorer
+from registry import get_registry
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def label_scores(scores):
+    rounded = np.rint(scores).astype(int)
+    return pd.Series(rounded).map(scorer.QUALITY_MAPPING).fillna("Unknown").to_numpy()
+
+
+def score_csv(source, destination, chunksize=DEFAULT_CHUNKSIZE, model_dir="."):
+    # Baca CSV per chunk -> skor -> tulis langsung ke output,
+    # sehingga memori hanya sebesar satu chunk berapa pun ukuran filenya
+    model = get_registry(model_dir).get()
+
+    rows = 0
+    start = time.perf_counter()
+
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+        missing = [col for col in model.feature_columns if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Kolom tidak ditemukan di CSV: {', '.join(missing)}")
+
+        X = chunk[model.feature_columns].to_numpy(dtype=np.float64)
+        scores = scorer.score(model.scorer, X)
+
+        chunk["predicted_score"] = scores
+        chunk["predicted_quality"] = label_scores(scores)
+        chunk.to_csv(destination, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+        rows += len(chunk)
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else float("inf"),
+        "model_version": model.version,
+    }
+
+
+# =========================
+# CLI: python batch_predict.py input.csv -o output.csv
+# =========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch scoring CSV wine quality")
+    parser.add_argument("input", help="CSV dengan kolom yang sama seperti Wine Quality Dataset.csv")
+    parser.add_argument("-o", "--output", default="predictions.csv")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--partition", help="pakai model partisi ini (default: artifact di root)")
+    args = parser.parse_args()
+
+    import partitions
+
+    model_dir = partitions.get_partition(args.partition).model_dir
+    stats = score_csv(args.input, args.output, chunksize=args.chunksize, model_dir=model_dir)
+    print(
+        f"{stats['rows']} baris -> {args.output} dalam {stats['seconds']:.2f} s "
+        f"({stats['rows_per_sec']:,.0f} rows/sec, model {stats['model_version']})"
+    )
@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import joblib
+
+import dataset
+import ridge_cv
+import scorer
+import tuning
+import vif
+from prediction_cache import PredictionCache
+from registry import ModelRegistry
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_SIZES = [1_000, 100_000]
+BASELINE_FILE = "benchmark_baseline.json"
+# Dibandingkan dengan waktu terbaik (min_s), yang lebih stabil daripada median
+REGRESSION_THRESHOLD = 1.5
+
+# Kasus mahal hanya dijalankan sampai ukuran ini (GridSearchCV 10M baris tidak realistis)
+SIZE_LIMITS = {
+    "gridsearch_ridge": 100_000,
+    "gridsearch_lasso": 100_000,
+    "tune_ridge_svd": 10_000_000,
+    "tune_lasso_path": 1_000_000,
+}
+
+ALPHAS = np.logspace(-3, 3, 20)
+FEATURES = ["fixed acidity", "volatile acidity", "citric acid", "residual sugar", "chlorides",
+            "free sulfur dioxide", "total sulfur dioxide", "sulphates", "alcohol"]
+
+
+# =========================
+# DATA SINTETIS
+# =========================
+def make_dataset(n_rows, workdir, seed=0):
+    # Resample baris Wine Quality Dataset.csv (dengan pengembalian) sampai n_rows
+    path = os.path.join(workdir, f"wine_{n_rows}.csv")
+    if not os.path.exists(path):
+        base = pd.read_csv(dataset.DATA_PATH)
+        idx = np.random.default_rng(seed).integers(0, len(base), n_rows)
+        base.iloc[idx].to_csv(path, index=False)
+    return path
+
+
+def prepare_training_data(df):
+    df = df.drop(columns="alcohol_level")
+    numeric_cols = df.select_dtypes(include="number").columns
+    Q1 = df[numeric_cols].quantile(0.25)
+    Q3 = df[numeric_cols].quantile(0.75)
+    IQR = Q3 - Q1
+    df = df[~((df[numeric_cols] < Q1 - 1.5 * IQR) | (df[numeric_cols] > Q3 + 1.5 * IQR)).any(axis=1)]
+    X = df[FEATURES].to_numpy()
+    return (X - X.mean(axis=0)) / X.std(axis=0), df["quality"].to_numpy(dtype=np.float64)
+
+
+# =========================
+# KASUS BENCHMARK
+# =========================
+def build_cases(path):
+    from sklearn.model_selection import GridSearchCV
+    from sklearn.linear_model import Ridge, Lasso
+
+    df = pd.read_csv(path)
+    parquet = path.replace(".csv", ".parquet")
+    dataset.read_csv(path).to_parquet(parquet, index=False)
+    numeric = df.drop(columns="alcohol_level").select_dtypes(include="number")
+    X, y = prepare_training_data(df)
+
+    sample = df[FEATURES].head(1)
+    sample_vector = sample.to_numpy()[0]
+    batch = df[FEATURES].to_numpy(dtype=np.float64)
+
+    fc, sc, model = (joblib.load(f) for f in ["feature_columns.joblib", "scaler.joblib", "ridge_model.joblib"])
+    weights = scorer.compile_scorer(sc, model)
+    registry = ModelRegistry()
+    snapshot = registry.get()
+    cache = PredictionCache()
+
+    def iqr_filter():
+        Q1, Q3 = numeric.quantile(0.25), numeric.quantile(0.75)
+        IQR = Q3 - Q1
+        return numeric[~((numeric < Q1 - 1.5 * IQR) | (numeric > Q3 + 1.5 * IQR)).any(axis=1)]
+
+    def artifact_load():
+        # Seperti prediction_app() sebelum registry: tiga joblib.load per klik
+        return [joblib.load(f) for f in ["feature_columns.joblib", "scaler.joblib", "ridge_model.joblib"]]
+
+    return {
+        "load_csv": lambda: pd.read_csv(path),
+        "load_csv_typed": lambda: dataset.read_csv(path),
+        "load_parquet": lambda: pd.read_parquet(parquet),
+        "iqr_filter": iqr_filter,
+        "vif": lambda: vif.variance_inflation_factors(numeric.to_numpy()),
+        "gridsearch_ridge": lambda: GridSearchCV(
+            Ridge(), {"alpha": ALPHAS}, cv=10, scoring="neg_mean_squared_error"
+        ).fit(X, y),
+        "gridsearch_lasso": lambda: GridSearchCV(
+            Lasso(max_iter=5000), {"alpha": ALPHAS}, cv=10, scoring="neg_mean_squared_error"
+        ).fit(X, y),
+        "tune_ridge_svd": lambda: ridge_cv.kfold_mse(X, y, ALPHAS, cv=10),
+        "tune_lasso_path": lambda: tuning.tune_lasso(X, y, ALPHAS, cv=10),
+        "artifact_load": artifact_load,
+        "registry_get": registry.get,
+        "predict_single_sklearn": lambda: model.predict(sc.transform(sample[fc])),
+        "predict_single_scorer": lambda: scorer.score(weights, sample_vector),
+        "predict_single_cached": lambda: cache.predict(snapshot, sample_vector),
+        "predict_batch_sklearn": lambda: model.predict(sc.transform(batch)),
+        "predict_batch_scorer": lambda: scorer.score(weights, batch),
+    }
+
+
+def time_case(fn, repeats, min_time=0.2):
+    # Fungsi cepat diulang dalam loop supaya resolusi timer tidak dominan
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    loops = max(1, int(min_time / max(first, 1e-9))) if first < min_time else 1
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+    return {"median_s": statistics.median(timings), "min_s": min(timings), "loops": loops}
+
+
+def run(sizes, repeats, only=None):
+    warnings.filterwarnings("ignore")
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in sizes:
+            cases = build_cases(make_dataset(n_rows, workdir))
+            for name, fn in cases.items():
+                if only and name not in only:
+                    continue
+                if n_rows > SIZE_LIMITS.get(name, float("inf")):
+                    continue
+                timing = time_case(fn, repeats)
+                results.append({"case": name, "rows": n_rows, **timing})
+                print(f"{name:<24} {n_rows:>10,} rows  {timing['median_s'] * 1000:>10.3f} ms", flush=True)
+
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+# =========================
+# BASELINE COMPARISON
+# =========================
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    base = {(r["case"], r["rows"]): r["min_s"] for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        key = (r["case"], r["rows"])
+        if key not in base:
+            continue
+        r["baseline_s"] = base[key]
+        r["ratio"] = r["min_s"] / base[key]
+        if r["ratio"] > threshold:
+            regressions.append(r)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark load / train / tune / predict")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="jumlah baris sintetis, mis. 1000 100000 10000000")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--cases", nargs="+", help="hanya jalankan kasus tertentu")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="simpan hasil sebagai baseline baru")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeats, args.cases)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+
+    with open(args.baseline if args.save_baseline else args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for r in regressions:
+        print(f"REGRESI {r['case']} @ {r['rows']:,} rows: {r['ratio']:.2f}x baseline")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,166 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import dataset
+import outliers
+from feature_store import chunk_moments, merge_moments, empty_moments
+
+
+# =========================
+# CONFIG
+# =========================
+NUMERIC_COLUMNS = outliers.NUMERIC_COLUMNS
+CHUNKSIZE = 200_000
+
+_memo = {}
+_lock = threading.Lock()
+
+
+# =========================
+# RUNNING CORRELATION
+# =========================
+# Statistik cukup untuk matriks korelasi: n, mean, dan co-moment M2
+# (setara counts / sums / cross-products, tapi stabil secara numerik).
+# Menambah k baris = O(k p^2); menggabungkan dua ringkasan = O(p^2).
+class RunningCorrelation:
+
+    def __init__(self, columns=NUMERIC_COLUMNS, moments=None):
+        self.columns = list(columns)
+        self.moments = moments if moments is not None else empty_moments(len(self.columns))
+
+    @property
+    def n(self):
+        return self.moments[0]
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        # Baris dengan NaN dilewati (dataset ini tidak punya nilai kosong)
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values):
+            self.moments = merge_moments(self.moments, chunk_moments(values))
+        return self
+
+    def merge(self, other):
+        self.moments = merge_moments(self.moments, other.moments)
+        return self
+
+    def matrix(self):
+        _, _, m2 = self.moments
+        std = np.sqrt(np.diag(m2))
+        return pd.DataFrame(m2 / np.outer(std, std), index=self.columns, columns=self.columns)
+
+    def to_dict(self):
+        n, mean, m2 = self.moments
+        return {"columns": self.columns, "n": int(n), "mean": mean.tolist(), "m2": m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["columns"], (d["n"], np.array(d["mean"]), np.array(d["m2"])))
+
+
+# =========================
+# PER DATASET (incremental saat file hanya ditambah baris di akhir)
+# =========================
+def bounds_key(lower, upper):
+    payload = json.dumps([lower, upper], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def _state_path(path, key):
+    # State mengikuti file (bukan versi), jadi path ikut di-hash: CSV partisi
+    # semuanya bernama data.csv
+    name = os.path.splitext(os.path.basename(path))[0]
+    path_id = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+    return os.path.join(dataset.CACHE_DIR, f"{name}-{path_id}.corr-{key}.json")
+
+
+def _prefix_sha(path, n_bytes):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        remaining = n_bytes
+        while remaining:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h.hexdigest()
+
+
+def _update_from(stats, frames, lower, upper):
+    lo = np.array([lower[c] for c in stats.columns])
+    hi = np.array([upper[c] for c in stats.columns])
+    for chunk in frames:
+        values = chunk[stats.columns].to_numpy(dtype=np.float64)
+        # Filter IQR dengan batas training yang tetap, sama seperti pipeline.train
+        stats.update(values[~((values < lo) | (values > hi)).any(axis=1)])
+    return stats
+
+
+def _appended_rows(path, offset):
+    with open(path, "rb") as f:
+        header = f.readline().decode().strip().split(",")
+        f.seek(offset)
+        tail = f.read()
+    return pd.read_csv(io.BytesIO(tail), header=None, names=header, dtype=dataset.SCHEMA)
+
+
+def load_correlation(path, lower, upper):
+    # Korelasi baris bersih (batas IQR dari training) untuk versi dataset saat ini.
+    # Jika versi sebelumnya adalah prefix file ini (append-only), hanya baris
+    # baru yang di-parse; selain itu dihitung ulang per chunk.
+    version = dataset.dataset_version(path)
+    key = bounds_key(lower, upper)
+    memo_key = (os.path.abspath(path), version, key)
+    if memo_key in _memo:
+        return _memo[memo_key]
+
+    with _lock:
+        if memo_key in _memo:
+            return _memo[memo_key]
+
+        state_path = _state_path(path, key)
+        state = None
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+
+        size = os.path.getsize(path)
+        if state is not None and state["version"] == version:
+            _memo[memo_key] = (version, RunningCorrelation.from_dict(state["stats"]))
+            return _memo[memo_key]
+
+        if (state is not None and state["bytes"] <= size
+                and _prefix_sha(path, state["bytes"]) == state["prefix_sha"]):
+            stats = RunningCorrelation.from_dict(state["stats"])
+            _update_from(stats, [_appended_rows(path, state["bytes"])], lower, upper)
+        else:
+            stats = _update_from(
+                RunningCorrelation(), dataset.read_csv(path, chunksize=CHUNKSIZE), lower, upper
+            )
+
+        # Append hanya aman dideteksi jika file berakhir di batas baris
+        with open(path, "rb") as f:
+            f.seek(max(size - 1, 0))
+            complete = f.read(1) == b"\n"
+
+        os.makedirs(dataset.CACHE_DIR, exist_ok=True)
+        tmp = state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "version": version,
+                "bytes": size if complete else 0,
+                # sha256 seluruh file = prefix_sha untuk pengecekan append berikutnya
+                "prefix_sha": dataset.file_hash(path) if complete else None,
+                "stats": stats.to_dict(),
+            }, f)
+        os.replace(tmp, state_path)
+
+        _memo[memo_key] = (version, stats)
+    return _memo[memo_key]
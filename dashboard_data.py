@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import dataset
+
+
+# =========================
+# CONFIG
+# =========================
+ALCOHOL_BINS = [0, 9, 11, 13, 20]
+ALCOHOL_BIN_LABELS = ["Rendah", "Sedang", "Tinggi", "Sangat Tinggi"]
+
+# Titik outlier boxplot yang ikut disimpan per kualitas (sisanya dibuang)
+MAX_OUTLIERS = 50
+
+# Di atas jumlah baris ini scatter pH vs quality diganti density heatmap
+SCATTER_MAX_POINTS = 20_000
+PH_BINS = 60
+
+_aggregates = {}
+_lock = threading.Lock()
+
+
+# =========================
+# COMPUTE
+# =========================
+def _box_stats(values, decimals=4):
+    # Statistik boxplot ala Plotly (quartile linear, whisker 1.5 IQR).
+    # Dibulatkan agar sisa pembulatan float32 tidak ikut tampil di hover.
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(outliers) > MAX_OUTLIERS:
+        outliers = outliers[np.linspace(0, len(outliers) - 1, MAX_OUTLIERS).astype(int)]
+
+    return {
+        "q1": round(float(q1), decimals),
+        "median": round(float(median), decimals),
+        "q3": round(float(q3), decimals),
+        "lowerfence": round(float(inside.min()), decimals),
+        "upperfence": round(float(inside.max()), decimals),
+        "outliers": np.round(outliers, decimals).tolist(),
+    }
+
+
+def _ph_quality_density(df, bins=PH_BINS):
+    # Histogram 2D pH x quality; ukurannya = bins x jumlah kualitas,
+    # tidak bergantung pada jumlah baris
+    # Baris dengan pH/quality kosong tidak ikut dihitung (histogram2d gagal pada NaN)
+    valid = df[["pH", "quality"]].dropna()
+    ph = valid["pH"].to_numpy(dtype=np.float64)
+    quality = valid["quality"].to_numpy(dtype=np.float64)
+    if not len(ph):
+        return {"ph_centers": [], "qualities": [], "counts": []}
+
+    qualities = np.sort(np.unique(quality))
+    low, high = ph.min(), ph.max()
+    if low == high:
+        # pH konstan (partisi kecil): lebarkan supaya edges tidak nol
+        low, high = low - 0.5, high + 0.5
+    edges = np.linspace(low, high, bins + 1)
+
+    counts, _, _ = np.histogram2d(
+        ph, quality,
+        bins=[edges, np.append(qualities, qualities[-1] + 1) - 0.5]
+    )
+
+    return {
+        "ph_centers": np.round((edges[:-1] + edges[1:]) / 2, 4).tolist(),
+        "qualities": [int(q) for q in qualities],
+        "counts": counts.T.astype(int).tolist(),
+    }
+
+
+def compute_aggregates(df):
+    quality_counts = df["quality"].value_counts().sort_index()
+
+    alcohol_box = {
+        int(q): _box_stats(group)
+        for q, group in df.groupby("quality", observed=True)["alcohol"]
+    }
+
+    alcohol_bins = pd.cut(df["alcohol"], bins=ALCOHOL_BINS, labels=ALCOHOL_BIN_LABELS)
+    bin_means = df.groupby(alcohol_bins, observed=True)["quality"].mean()
+
+    return {
+        "rows": int(len(df)),
+        "quality_counts": {int(q): int(n) for q, n in quality_counts.items()},
+        "alcohol_box": alcohol_box,
+        "alcohol_bin_means": {str(label): float(mean) for label, mean in bin_means.items()},
+        "ph_quality_density": _ph_quality_density(df),
+    }
+
+
+# =========================
+# PERSISTENCE
+# =========================
+def _aggregates_path(path, version):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(dataset.CACHE_DIR, f"{name}-{version}.aggregates.json")
+
+
+def _from_json(raw):
+    # JSON mengubah key int menjadi string; kembalikan ke int
+    raw["quality_counts"] = {int(q): n for q, n in raw["quality_counts"].items()}
+    raw["alcohol_box"] = {int(q): stats for q, stats in raw["alcohol_box"].items()}
+    return raw
+
+
+def load_aggregates(path=dataset.DATA_PATH):
+    # Dihitung sekali per versi dataset, disimpan di samping cache Parquet
+    version = dataset.dataset_version(path)
+    key = (os.path.abspath(path), version)
+
+    if key in _aggregates:
+        return _aggregates[key]
+
+    with _lock:
+        if key not in _aggregates:
+            agg_path = _aggregates_path(path, version)
+            if os.path.exists(agg_path):
+                with open(agg_path) as f:
+                    aggregates = _from_json(json.load(f))
+            else:
+                aggregates = compute_aggregates(dataset.load_dataset(path))
+                os.makedirs(dataset.CACHE_DIR, exist_ok=True)
+                tmp = agg_path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(aggregates, f)
+                os.replace(tmp, agg_path)
+            _aggregates[key] = aggregates
+
+    return _aggregates[key]
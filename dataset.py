@@ -0,0 +1,119 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+
+# =========================
+# CONFIG
+# =========================
+DATA_PATH = "Wine Quality Dataset.csv"
+CACHE_DIR = ".cache"
+
+CHEMISTRY_COLUMNS = [
+    "fixed acidity",
+    "volatile acidity",
+    "citric acid",
+    "residual sugar",
+    "chlorides",
+    "free sulfur dioxide",
+    "total sulfur dioxide",
+    "density",
+    "pH",
+    "sulphates",
+    "alcohol",
+]
+
+ALCOHOL_LEVELS = ["Low", "Medium", "High", "Very High"]
+
+# Schema penuh (lossless) untuk parsing CSV dan cache Parquet
+SCHEMA = {
+    **{col: "float64" for col in CHEMISTRY_COLUMNS},
+    "quality": "int8",
+    "alcohol_level": pd.CategoricalDtype(ALCOHOL_LEVELS, ordered=True),
+}
+
+# Schema ringkas untuk frame yang disimpan di memori oleh halaman dashboard.
+# Training memakai compact=False: pembulatan float32 bisa menggeser batas IQR.
+COMPACT_SCHEMA = {col: "float32" for col in CHEMISTRY_COLUMNS}
+
+# Jumlah DataFrame (file/partisi berbeda) yang disimpan di memori proses;
+# berpindah partisi tidak menumpuk seluruh estate di RAM
+MAX_FRAMES = 4
+
+_hash_memo = {}
+_frames = {}
+_lock = threading.Lock()
+
+
+# =========================
+# VERSIONING
+# =========================
+def file_hash(path=DATA_PATH):
+    # Hash isi file; di-memo per (path, mtime, size) agar tidak dibaca ulang tiap rerun
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _hash_memo:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _hash_memo[memo_key] = h.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def dataset_version(path=DATA_PATH):
+    return file_hash(path)[:16]
+
+
+# =========================
+# LOADING
+# =========================
+def read_csv(path=DATA_PATH, **kwargs):
+    # Parse CSV dengan schema eksplisit (tanpa inferensi dtype)
+    return pd.read_csv(path, dtype=SCHEMA, **kwargs)
+
+
+def _parquet_path(path, version):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}-{version}.parquet")
+
+
+def _load(path, version, compact):
+    parquet = _parquet_path(path, version)
+    if os.path.exists(parquet):
+        df = pd.read_parquet(parquet)
+    else:
+        # CSV hanya di-parse sekali per versi, berikutnya dibaca dari Parquet
+        df = read_csv(path)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = parquet + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, parquet)
+
+    if compact:
+        df = df.astype(COMPACT_SCHEMA)
+    return df
+
+
+def load_dataset(path=DATA_PATH, compact=True):
+    # Satu DataFrame per versi dataset untuk seluruh proses.
+    # Frame ini dipakai bersama: jangan diubah in-place, buat salinan bila perlu.
+    version = dataset_version(path)
+    key = (os.path.abspath(path), version, compact)
+
+    df = _frames.get(key)
+    if df is None:
+        with _lock:
+            df = _frames.get(key)
+            if df is None:
+                df = _load(path, version, compact)
+                # Versi lama dari file yang sama dibuang dari memori
+                for old in [k for k in _frames if k[0] == key[0] and k[1] != version]:
+                    del _frames[old]
+                _frames[key] = df
+                # Frame yang paling lama dimuat dibuang lebih dulu
+                while len(_frames) > MAX_FRAMES:
+                    del _frames[next(iter(_frames))]
+    return df
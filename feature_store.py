@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import dataset
+import outliers
+
+
+# =========================
+# CONFIG
+# =========================
+STORE_ROOT = os.path.join(dataset.CACHE_DIR, "features")
+STORE_VERSION = 1
+DTYPE = np.float32
+DEFAULT_CHUNKSIZE = 200_000
+
+# Kolom yang ikut dihitung momennya (korelasi & VIF), sama dengan numeric_cols di training
+NUMERIC_COLUMNS = outliers.NUMERIC_COLUMNS
+
+
+# =========================
+# STREAMING MOMENTS (mergeable)
+# =========================
+# (n, mean, M2) dengan M2 = matriks co-moment sum((x - mean)(x - mean)^T).
+# Dua ringkasan digabung dengan rumus Chan et al. (Welford versi paralel),
+# sehingga chunk bisa diproses satu per satu tanpa kehilangan presisi.
+def chunk_moments(values):
+    n = len(values)
+    mean = values.mean(axis=0)
+    centered = values - mean
+    return n, mean, centered.T @ centered
+
+
+def merge_moments(a, b):
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    m2 = m2_a + m2_b + np.outer(delta, delta) * (n_a * n_b / n)
+    return n, mean, m2
+
+
+def empty_moments(p):
+    return 0, np.zeros(p), np.zeros((p, p))
+
+
+# =========================
+# BUILD (tiga pass streaming, memori sebesar satu chunk)
+# =========================
+def store_key(data_path, features, target, test_size, random_state):
+    h = hashlib.sha256()
+    h.update(dataset.file_hash(data_path).encode())
+    h.update(json.dumps([features, target, test_size, random_state]).encode())
+    h.update(str(STORE_VERSION).encode())
+    return h.hexdigest()[:16]
+
+
+def _kept_chunks(path, lower, upper, chunksize):
+    lo = np.array([lower[c] for c in NUMERIC_COLUMNS])
+    hi = np.array([upper[c] for c in NUMERIC_COLUMNS])
+    for chunk in dataset.read_csv(path, chunksize=chunksize):
+        values = chunk[NUMERIC_COLUMNS].to_numpy(dtype=np.float64)
+        keep = ~((values < lo) | (values > hi)).any(axis=1)
+        yield chunk[keep]
+
+
+def build_store(data_path, features, target="quality", test_size=0.2, random_state=42,
+                chunksize=DEFAULT_CHUNKSIZE, root=STORE_ROOT):
+    from sklearn.model_selection import train_test_split
+
+    key = store_key(data_path, features, target, test_size, random_state)
+    target_dir = os.path.join(root, key)
+    feature_idx = [NUMERIC_COLUMNS.index(c) for c in features]
+    start = time.perf_counter()
+
+    # Pass 1: batas IQR dari sketch KLL (memori konstan)
+    sketches = outliers.sketch_columns(data_path, chunksize=chunksize)
+    _, lower, upper = outliers.iqr_bounds(sketches)
+    rows_before = sketches[NUMERIC_COLUMNS[0]].n
+
+    # Pass 2: jumlah baris bersih, momen (mean/var/korelasi), preview
+    moments = empty_moments(len(NUMERIC_COLUMNS))
+    preview = None
+    for kept in _kept_chunks(data_path, lower, upper, chunksize):
+        if len(kept):
+            moments = merge_moments(moments, chunk_moments(kept[NUMERIC_COLUMNS].to_numpy(dtype=np.float64)))
+        if preview is None or len(preview) < 5:
+            head = kept[NUMERIC_COLUMNS].head(5)
+            preview = head if preview is None else pd.concat([preview, head]).head(5)
+    n, mean, m2 = moments
+
+    # Split ditentukan di depan: baris ditulis dengan urutan [train..., test...]
+    # sehingga train/test cukup berupa slice (view), bukan salinan fancy-index
+    train_idx, test_idx = train_test_split(np.arange(n), test_size=test_size, random_state=random_state)
+    position = np.empty(n, dtype=np.int64)
+    position[train_idx] = np.arange(len(train_idx))
+    position[test_idx] = len(train_idx) + np.arange(len(test_idx))
+
+    # StandardScaler (ddof=0) dari momen seluruh baris bersih
+    var = np.diag(m2)[feature_idx] / n
+    scale = np.sqrt(var)
+    scale[scale == 0] = 1.0
+    feature_mean = mean[feature_idx]
+
+    # Pass 3: tulis matriks yang sudah di-scale langsung ke file .npy (memmap)
+    os.makedirs(root, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=root)
+    try:
+        X = np.lib.format.open_memmap(os.path.join(tmp, "X.npy"), mode="w+", dtype=DTYPE, shape=(n, len(features)))
+        y = np.lib.format.open_memmap(os.path.join(tmp, "y.npy"), mode="w+", dtype=DTYPE, shape=(n,))
+        offset = 0
+        for kept in _kept_chunks(data_path, lower, upper, chunksize):
+            rows = position[offset:offset + len(kept)]
+            X[rows] = (kept[features].to_numpy(dtype=np.float64) - feature_mean) / scale
+            y[rows] = kept[target].to_numpy(dtype=np.float64)
+            offset += len(kept)
+        X.flush()
+        y.flush()
+        del X, y
+
+        meta = {
+            "key": key,
+            "data_path": data_path,
+            "data_version": dataset.dataset_version(data_path),
+            "features": features,
+            "target": target,
+            "numeric_columns": NUMERIC_COLUMNS,
+            "rows_before": int(rows_before),
+            "rows": int(n),
+            "n_train": int(len(train_idx)),
+            "n_test": int(len(test_idx)),
+            "mean": feature_mean.tolist(),
+            "var": var.tolist(),
+            "scale": scale.tolist(),
+            "numeric_mean": mean.tolist(),
+            "numeric_m2": m2.tolist(),
+            "lower": lower,
+            "upper": upper,
+            "build_seconds": time.perf_counter() - start,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        preview.to_json(os.path.join(tmp, "preview.json"), orient="split", index=False)
+
+        if os.path.exists(target_dir):
+            shutil.rmtree(tmp)
+        else:
+            os.rename(tmp, target_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    return FeatureStore(target_dir)
+
+
+# =========================
+# READ (memmap read-only, page cache dipakai bersama antar proses)
+# =========================
+class FeatureStore:
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.X = np.load(os.path.join(path, "X.npy"), mmap_mode="r")
+        self.y = np.load(os.path.join(path, "y.npy"), mmap_mode="r")
+        self.features = self.meta["features"]
+        self.n_train = self.meta["n_train"]
+
+    def train(self):
+        return self.X[:self.n_train], self.y[:self.n_train]
+
+    def test(self):
+        return self.X[self.n_train:], self.y[self.n_train:]
+
+    def unscale(self, X):
+        # Kembali ke satuan asli (float64), mis. untuk verifikasi scorer
+        return np.asarray(X, dtype=np.float64) * self.meta["scale"] + self.meta["mean"]
+
+    def scaler(self):
+        # StandardScaler yang setara dengan fit pada seluruh baris bersih
+        from sklearn.preprocessing import StandardScaler
+
+        sc = StandardScaler()
+        sc.mean_ = np.array(self.meta["mean"])
+        sc.var_ = np.array(self.meta["var"])
+        sc.scale_ = np.array(self.meta["scale"])
+        sc.n_samples_seen_ = self.meta["rows"]
+        sc.n_features_in_ = len(self.features)
+        # feature_names_in_ sengaja tidak diisi: semua pemakai (scorer.verify,
+        # model zoo) memberi ndarray, dan sklearn akan memperingatkan
+        # "X does not have valid feature names" di setiap training
+        return sc
+
+    def correlation(self):
+        m2 = np.array(self.meta["numeric_m2"])
+        std = np.sqrt(np.diag(m2))
+        return m2 / np.outer(std, std)
+
+    def preview(self):
+        return pd.read_json(os.path.join(self.path, "preview.json"), orient="split")
+
+
+def load_store(data_path, features, target="quality", test_size=0.2, random_state=42,
+               chunksize=DEFAULT_CHUNKSIZE, root=STORE_ROOT, rebuild=False):
+    key = store_key(data_path, features, target, test_size, random_state)
+    path = os.path.join(root, key)
+    if rebuild and os.path.exists(path):
+        shutil.rmtree(path)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return FeatureStore(path)
+    return build_store(data_path, features, target, test_size, random_state, chunksize, root)
+
+
+# =========================
+# CLI: python feature_store.py [dataset.csv]
+# =========================
+if __name__ == "__main__":
+    import pipeline
+
+    parser = argparse.ArgumentParser(description="Bangun feature store memmap (float32) untuk training")
+    parser.add_argument("data", nargs="?", default=dataset.DATA_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    store = load_store(
+        args.data, pipeline.FEATURES,
+        test_size=pipeline.DEFAULT_PARAMS["test_size"],
+        random_state=pipeline.DEFAULT_PARAMS["random_state"],
+        chunksize=args.chunksize, rebuild=args.rebuild,
+    )
+    meta = store.meta
+    print(
+        f"{store.path}: {meta['rows_before']} -> {meta['rows']} baris x {len(store.features)} fitur "
+        f"({store.X.nbytes / 1e6:.1f} MB float32, train {meta['n_train']} / test {meta['n_test']})"
+    )
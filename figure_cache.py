@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+import dataset
+import instrumentation
+
+
+# =========================
+# CONFIG
+# =========================
+FIGURE_DIR = os.path.join(dataset.CACHE_DIR, "figures")
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Batas folder .cache/figures; file paling lama (mtime) dihapus lebih dulu
+DEFAULT_MAX_DISK_BYTES = 128 * 1024 * 1024
+
+# Naikkan angka ini setiap kali fungsi build_* (visualisasi.py,
+# machine_learning.py) atau format serialisasi berubah, supaya JSON lama
+# di disk tidak dipakai lagi (file versi lain dihapus saat prune)
+FIGURE_VERSION = 2
+
+
+def figure_key(name, version, **params):
+    # Key = nama chart + versi dataset + hash parameter chart
+    # (FigureCache menambahkan FIGURE_VERSION di depannya)
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return f"{name}-{version}-{hashlib.sha256(payload.encode()).hexdigest()[:8]}"
+
+
+# =========================
+# SERIALISASI
+# =========================
+# Cache menyimpan go.Figure biasa; disk memakai API publik Plotly:
+# pio.to_json saat menulis, pio.from_json saat dibaca ulang setelah restart.
+# Typed array base64 tidak dipakai: validator Plotly 5.x menolaknya di go.Figure.
+def serialize(figure):
+    return pio.to_json(figure, validate=False)
+
+
+def deserialize(spec):
+    return pio.from_json(spec)
+
+
+# =========================
+# LRU CACHE (dibatasi ukuran byte JSON)
+# =========================
+# Figure di memori dipakai bersama semua session: hanya untuk dirender
+# (st.plotly_chart hanya memanggil to_dict()), jangan diubah setelah di-cache.
+class FigureCache:
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=FIGURE_DIR, max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _store(self, key, figure, size):
+        # Ukuran dihitung dari panjang JSON figure (perkiraan memori)
+        if key in self._items:
+            return
+        self._items[key] = (figure, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, old_size) = self._items.popitem(last=False)
+            self.bytes -= old_size
+            self.evictions += 1
+
+    def _read_disk(self, path):
+        try:
+            with open(path) as f:
+                spec = f.read()
+        except FileNotFoundError:
+            return None
+        # mtime = waktu terakhir dipakai, untuk urutan prune
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return spec
+
+    def _write_disk(self, path, spec):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=self.directory)
+        with os.fdopen(fd, "w") as f:
+            f.write(spec)
+        os.replace(tmp, path)
+        self._prune_disk()
+
+    def _prune_disk(self):
+        # Hapus JSON dari FIGURE_VERSION lain, lalu file paling lama sampai
+        # total ukuran folder <= max_disk_bytes
+        prefix = f"v{FIGURE_VERSION}-"
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if not entry.name.startswith(prefix):
+                    os.remove(entry.path)
+                    self.disk_evictions += 1
+                    continue
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.disk_evictions += 1
+
+    def get(self, key, build):
+        # Memori -> disk (.cache/figures, bertahan antar restart) -> build().
+        # Lock hanya dipegang untuk akses dict; baca disk dan build() berjalan
+        # di luar lock supaya chart lain (session lain) tidak ikut menunggu.
+        # Dua session yang miss bersamaan bisa sama-sama build; hasilnya sama.
+        key = f"v{FIGURE_VERSION}-{key}"
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[0]
+
+        path = self._path(key)
+        spec = self._read_disk(path)
+        if spec is not None:
+            figure = deserialize(spec)
+            with self._lock:
+                self.disk_hits += 1
+                self._store(key, figure, len(spec))
+            return figure
+
+        figure = build()
+        spec = serialize(figure)
+        with self._lock:
+            self.misses += 1
+            self._store(key, figure, len(spec))
+        self._write_disk(path, spec)
+        return figure
+
+    def stats(self):
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._items),
+            "kb": self.bytes / 1024,
+            "max_kb": self.max_bytes / 1024,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_figure_cache():
+    # Satu cache per proses, dipakai bersama oleh semua session Streamlit
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FigureCache()
+    return _cache
+
+
+instrumentation.register_cache("figure", lambda: get_figure_cache().stats())
+
+
+def cached_figure(key, build):
+    # `key` wajib memuat versi dataset/artifact (lihat figure_key)
+    return get_figure_cache().get(key, build)
@@ -0,0 +1,319 @@
+import argparse
+import hashlib
+import json
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+
+import dataset
+import outliers
+import pipeline
+import scorer
+from feature_store import chunk_moments, merge_moments, empty_moments
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_CHUNKSIZE = 200_000
+DEFAULT_FOLDS = pipeline.DEFAULT_PARAMS["cv"]
+DEFAULT_ALPHAS = np.asarray(pipeline.DEFAULT_PARAMS["alphas"])
+DEFAULT_TEST_SIZE = pipeline.DEFAULT_PARAMS["test_size"]
+DEFAULT_SEED = pipeline.DEFAULT_PARAMS["random_state"]
+
+FEATURES = pipeline.FEATURES
+TARGET = "quality"
+
+
+# =========================
+# SUFFICIENT STATISTICS
+# =========================
+# Untuk regresi linear/ridge dengan intercept cukup (n, mean, M2) dari
+# vektor gabungan [x_1..x_p, y]: M2[:p,:p] = co-moment X, M2[:p,p] = X^T y
+# (ter-center), M2[p,p] = SS_y. Ringkasan ini bisa di-merge (Chan et al.),
+# jadi chunk, file, maupun proses berbeda cukup mengirim (p+1)^2 angka.
+class SufficientStats:
+
+    def __init__(self, p, moments=None):
+        self.p = p
+        self.moments = moments if moments is not None else empty_moments(p + 1)
+
+    @property
+    def n(self):
+        return self.moments[0]
+
+    def update(self, X, y):
+        if len(y):
+            joint = np.column_stack([np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+            self.moments = merge_moments(self.moments, chunk_moments(joint))
+        return self
+
+    def merge(self, other):
+        self.moments = merge_moments(self.moments, other.moments)
+        return self
+
+    def copy(self):
+        n, mean, m2 = self.moments
+        return SufficientStats(self.p, (n, mean.copy(), m2.copy()))
+
+    def to_dict(self):
+        n, mean, m2 = self.moments
+        return {"p": self.p, "n": int(n), "mean": mean.tolist(), "m2": m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["p"], (d["n"], np.array(d["mean"]), np.array(d["m2"])))
+
+    def scaled(self, mean, scale):
+        # Momen X dalam ruang StandardScaler (mean/scale dari seluruh data)
+        n, m, m2 = self.moments
+        d = np.append(1 / scale, 1.0)
+        z_mean = np.append((m[:-1] - mean) / scale, m[-1])
+        return n, z_mean, m2 * np.outer(d, d)
+
+
+def _merge_all(stats):
+    total = stats[0].copy()
+    for s in stats[1:]:
+        total.merge(s)
+    return total
+
+
+# =========================
+# SOLVE (tanpa pernah memegang X di memori)
+# =========================
+def solve(stats, alpha, mean, scale):
+    # Sama dengan Ridge(alpha).fit(Z, y) / LinearRegression (alpha=0) pada
+    # Z = (X - mean) / scale: intercept tidak dipenalti, X & y di-center
+    p = stats.p
+    _, z_mean, m2 = stats.scaled(mean, scale)
+    A = m2[:p, :p] + alpha * np.eye(p)
+    if alpha > 0:
+        coef = np.linalg.solve(A, m2[:p, p])
+    else:
+        coef = np.linalg.lstsq(A, m2[:p, p], rcond=None)[0]
+    intercept = z_mean[p] - z_mean[:p] @ coef
+    return coef, intercept
+
+
+def sse(stats, coef, intercept, mean, scale):
+    # Jumlah kuadrat residual pada data `stats`, langsung dari momennya:
+    # sum(r^2) = n * mean(r)^2 + (Syy - 2 w.Szy + w^T Szz w)
+    p = stats.p
+    n, z_mean, m2 = stats.scaled(mean, scale)
+    mean_r = z_mean[p] - z_mean[:p] @ coef - intercept
+    centered = m2[p, p] - 2 * coef @ m2[:p, p] + coef @ m2[:p, :p] @ coef
+    return n * mean_r ** 2 + centered
+
+
+def evaluate(stats, coef, intercept, mean, scale):
+    n, _, m2 = stats.moments
+    mse = sse(stats, coef, intercept, mean, scale) / n
+    return {
+        "MSE": float(mse),
+        "RMSE": float(np.sqrt(mse)),
+        "R²": float(1 - mse * n / m2[-1, -1]),
+    }
+
+
+# =========================
+# STREAMING ACCUMULATION
+# =========================
+def _row_uniform(index, salt):
+    # Hash splitmix64 dari nomor baris global -> [0, 1): pembagian fold/test
+    # deterministik dan tidak bergantung pada ukuran chunk atau urutan proses
+    with np.errstate(over="ignore"):
+        x = index.astype(np.uint64) + np.uint64(salt)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / 2.0 ** 53
+
+
+def _file_salt(path, seed):
+    return int(hashlib.sha256(f"{dataset.file_hash(path)}:{seed}".encode()).hexdigest()[:15], 16)
+
+
+def iqr_limits(paths, chunksize=DEFAULT_CHUNKSIZE):
+    # Sketch KLL per file lalu di-merge -> satu set batas IQR untuk semua file
+    sketches = None
+    for path in paths:
+        part = outliers.sketch_columns(path, chunksize=chunksize)
+        sketches = part if sketches is None else {c: sketches[c].merge(part[c]) for c in sketches}
+    _, lower, upper = outliers.iqr_bounds(sketches)
+    return lower, upper
+
+
+def accumulate_file(path, limits=None, features=FEATURES, target=TARGET, folds=DEFAULT_FOLDS,
+                    test_size=DEFAULT_TEST_SIZE, seed=DEFAULT_SEED, chunksize=DEFAULT_CHUNKSIZE):
+    # Return dict statistik parsial satu file: {"test": ..., "folds": [...], rows_*}
+    p = len(features)
+    test = SufficientStats(p)
+    fold_stats = [SufficientStats(p) for _ in range(folds)]
+    salt = _file_salt(path, seed)
+    if limits is not None:
+        lo = np.array([limits[0][c] for c in outliers.NUMERIC_COLUMNS])
+        hi = np.array([limits[1][c] for c in outliers.NUMERIC_COLUMNS])
+
+    offset = rows_before = rows_after = 0
+    for chunk in dataset.read_csv(path, chunksize=chunksize):
+        index = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        rows_before += len(chunk)
+
+        if limits is not None:
+            values = chunk[outliers.NUMERIC_COLUMNS].to_numpy(dtype=np.float64)
+            keep = ~((values < lo) | (values > hi)).any(axis=1)
+            chunk, index = chunk[keep], index[keep]
+        rows_after += len(chunk)
+
+        X = chunk[features].to_numpy(dtype=np.float64)
+        y = chunk[target].to_numpy(dtype=np.float64)
+        u = _row_uniform(index, salt)
+        is_test = u < test_size
+        test.update(X[is_test], y[is_test])
+
+        fold = np.minimum(((u - test_size) / (1 - test_size) * folds).astype(int), folds - 1)
+        for k in range(folds):
+            mask = ~is_test & (fold == k)
+            fold_stats[k].update(X[mask], y[mask])
+
+    return {"test": test, "folds": fold_stats, "rows_before": rows_before, "rows_after": rows_after}
+
+
+def merge_partials(partials):
+    return {
+        "test": _merge_all([part["test"] for part in partials]),
+        "folds": [_merge_all(list(fs)) for fs in zip(*(part["folds"] for part in partials))],
+        "rows_before": sum(part["rows_before"] for part in partials),
+        "rows_after": sum(part["rows_after"] for part in partials),
+    }
+
+
+# Parsial dari proses/mesin lain hanya boleh di-merge jika dihitung dengan
+# `limits`, `folds`, `test_size` dan `seed` yang sama
+def save_partial(partial, path):
+    state = {
+        "test": partial["test"].to_dict(),
+        "folds": [s.to_dict() for s in partial["folds"]],
+        "rows_before": partial["rows_before"],
+        "rows_after": partial["rows_after"],
+    }
+    with open(path, "w") as f:
+        json.dump(state, f)
+
+
+def load_partial(path):
+    with open(path) as f:
+        state = json.load(f)
+    state["test"] = SufficientStats.from_dict(state["test"])
+    state["folds"] = [SufficientStats.from_dict(s) for s in state["folds"]]
+    return state
+
+
+# =========================
+# FIT
+# =========================
+def fit(partial, alphas=DEFAULT_ALPHAS, features=FEATURES):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.linear_model import LinearRegression, Ridge
+
+    folds = partial["folds"]
+    train = _merge_all(folds)
+    everything = _merge_all(folds + [partial["test"]])
+
+    # StandardScaler di-fit pada semua baris bersih (seperti pipeline.train)
+    n, mean_all, m2_all = everything.moments
+    mean, var = mean_all[:-1], np.diag(m2_all)[:-1] / n
+    scale = np.sqrt(var)
+    scale[scale == 0] = 1.0
+
+    # K-fold CV alpha langsung dari statistik fold: latih pada k-1 fold, uji pada 1
+    cv_mse = np.empty((len(folds), len(alphas)))
+    for k, held_out in enumerate(folds):
+        rest = _merge_all(folds[:k] + folds[k + 1:])
+        for j, alpha in enumerate(alphas):
+            coef, intercept = solve(rest, alpha, mean, scale)
+            cv_mse[k, j] = sse(held_out, coef, intercept, mean, scale) / held_out.n
+    best_alpha = float(alphas[int(np.argmin(cv_mse.mean(axis=0)))])
+
+    scaler = StandardScaler()
+    scaler.mean_, scaler.var_, scaler.scale_ = mean, var, scale
+    scaler.n_samples_seen_ = int(n)
+    scaler.n_features_in_ = len(features)
+    scaler.feature_names_in_ = np.array(features, dtype=object)
+
+    models = {"scaler": scaler}
+    metrics = {}
+    for name, model in [("linear", LinearRegression()), ("ridge", Ridge(alpha=best_alpha))]:
+        coef, intercept = solve(train, best_alpha if name == "ridge" else 0.0, mean, scale)
+        model.coef_, model.intercept_ = coef, float(intercept)
+        model.n_features_in_ = len(features)
+        models[name] = model
+        metrics[name] = evaluate(partial["test"], coef, intercept, mean, scale)
+
+    return {
+        "models": models,
+        "feature_columns": list(features),
+        "scorer": scorer.compile_scorer(scaler, models["ridge"]),
+        "cv_mse": cv_mse,
+        "metrics": {
+            "rows_before": partial["rows_before"],
+            "rows_after": partial["rows_after"],
+            "n_train": int(train.n),
+            "n_test": int(partial["test"].n),
+            "best_alpha_ridge": best_alpha,
+            **metrics,
+        },
+    }
+
+
+def train_incremental(paths, alphas=DEFAULT_ALPHAS, folds=DEFAULT_FOLDS, test_size=DEFAULT_TEST_SIZE,
+                      seed=DEFAULT_SEED, chunksize=DEFAULT_CHUNKSIZE, filter_outliers=True, n_jobs=-1):
+    start = time.perf_counter()
+    limits = iqr_limits(paths, chunksize) if filter_outliers else None
+
+    # Satu proses per file; yang dikirim balik hanya statistik (p+1)^2
+    partials = Parallel(n_jobs=n_jobs)(
+        delayed(accumulate_file)(path, limits, folds=folds, test_size=test_size, seed=seed, chunksize=chunksize)
+        for path in paths
+    )
+    result = fit(merge_partials(partials), alphas)
+    result["metrics"]["train_seconds"] = time.perf_counter() - start
+    return result
+
+
+def version_key(paths, alphas, folds, test_size, seed):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(dataset.file_hash(path).encode())
+    h.update(json.dumps([list(map(float, alphas)), folds, test_size, seed, "incremental"]).encode())
+    return h.hexdigest()[:16]
+
+
+# =========================
+# CLI: python incremental.py part1.csv part2.csv ... [--publish]
+# =========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training Ridge out-of-core dari statistik cukup (X^T X, X^T y)")
+    parser.add_argument("data", nargs="*", default=[dataset.DATA_PATH])
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--no-outlier-filter", action="store_true")
+    parser.add_argument("--publish", action="store_true", help="tulis artifact produksi untuk Prediction App")
+    args = parser.parse_args()
+
+    result = train_incremental(
+        args.data, folds=args.folds, chunksize=args.chunksize, filter_outliers=not args.no_outlier_filter
+    )
+    m = result["metrics"]
+    print(
+        f"{m['rows_before']} -> {m['rows_after']} baris, alpha={m['best_alpha_ridge']:.4f}, "
+        f"test RMSE={m['ridge']['RMSE']:.4f}, R²={m['ridge']['R²']:.4f} ({m['train_seconds']:.2f} s)"
+    )
+
+    if args.publish:
+        key = version_key(args.data, DEFAULT_ALPHAS, args.folds, DEFAULT_TEST_SIZE, DEFAULT_SEED)
+        pipeline.publish(result, key)
+        print(f"published model version {key}")
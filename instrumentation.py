@@ -0,0 +1,244 @@
+import functools
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# =========================
+# CONFIG
+# =========================
+# Default aktif/tidak untuk proses ini; halaman Streamlit bisa mengubahnya
+# per session lewat configure() (toggle di sidebar)
+ENABLED_DEFAULT = os.environ.get("WINE_DIAGNOSTICS", "0") == "1"
+
+# Rerun fragment tidak memanggil configure(), jadi record dibatasi
+MAX_RECORDS = 500
+
+logger = logging.getLogger("wine.diagnostics")
+
+# Streamlit menjalankan script setiap session di thread-nya sendiri,
+# jadi state per thread = state per rerun session
+_state = threading.local()
+
+
+def configure(enabled):
+    _state.enabled = enabled
+    _state.records = []
+    _state.stack = []
+
+
+def is_enabled():
+    return getattr(_state, "enabled", ENABLED_DEFAULT)
+
+
+def records():
+    return list(getattr(_state, "records", []))
+
+
+# =========================
+# TRACEMALLOC (hanya selama ada stage aktif)
+# =========================
+# tracemalloc berlaku untuk seluruh proses, jadi dinyalakan saat stage terluar
+# pertama (di thread mana pun) dimulai dan dimatikan saat stage aktif terakhir
+# selesai. Session dengan diagnostics nonaktif tidak ikut menanggung biaya
+# tracing kecuali sedang berjalan bersamaan dengan session yang aktif.
+# Catatan: reset_peak() juga global, jadi peak_alloc_kb dari beberapa session
+# yang berjalan bersamaan saling bercampur (angka perkiraan).
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        # Tracing yang sudah aktif sebelumnya (mis. python -X tracemalloc) dibiarkan
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+# =========================
+# STAGE TIMER
+# =========================
+@contextmanager
+def stage(name):
+    # Catat wall time, CPU time (thread), dan puncak alokasi memori.
+    # Jika nonaktif hanya satu pengecekan flag, tanpa tracemalloc.
+    if not is_enabled():
+        yield
+        return
+
+    if not hasattr(_state, "records"):
+        configure(True)
+    outermost = not _state.stack
+    if outermost:
+        _acquire_tracing()
+
+    # Tahap bertingkat: puncak memori anak ikut dihitung ke induknya
+    current, peak = tracemalloc.get_traced_memory()
+    if _state.stack:
+        _state.stack[-1]["peak"] = max(_state.stack[-1]["peak"], peak)
+    tracemalloc.reset_peak()
+
+    # Record ditambahkan saat masuk agar urutan tabel = urutan eksekusi
+    record = {"stage": name, "depth": len(_state.stack)}
+    _state.records.append(record)
+    del _state.records[:-MAX_RECORDS]
+
+    modules_before = len(sys.modules)
+    frame = {"start_mem": current, "peak": current}
+    _state.stack.append(frame)
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        _, peak = tracemalloc.get_traced_memory()
+        _state.stack.pop()
+        if outermost:
+            _release_tracing()
+
+        peak = max(frame["peak"], peak)
+        if _state.stack:
+            _state.stack[-1]["peak"] = max(_state.stack[-1]["peak"], peak)
+
+        record.update({
+            "wall_ms": wall * 1000,
+            "cpu_ms": cpu * 1000,
+            "peak_alloc_kb": (peak - frame["start_mem"]) / 1024,
+            # Modul yang pertama kali di-import di dalam stage ini (cold start)
+            "new_modules": len(sys.modules) - modules_before,
+        })
+        logger.info(json.dumps(record))
+
+
+def timed(name=None):
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# =========================
+# CACHE STATS
+# =========================
+# Modul cache mendaftarkan fungsi stats() (hits/misses/ukuran) agar
+# terlihat di panel diagnostics
+_caches = {}
+
+
+def register_cache(name, stats_fn):
+    _caches[name] = stats_fn
+
+
+def cache_stats():
+    return [{"cache": name, **stats_fn()} for name, stats_fn in _caches.items()]
+
+
+# =========================
+# IMPORT TIME (-X importtime)
+# =========================
+_import_profiles = {}
+
+
+def import_profile(module, top=15):
+    # Jalankan `python -X importtime -c "import <module>"` di proses baru
+    # (import di proses ini sudah ter-cache) lalu ringkas per package top-level
+    if module not in _import_profiles:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        packages = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|", 2)
+            package = name.strip().split(".")[0]
+            packages[package] = packages.get(package, 0) + int(self_us)
+
+        _import_profiles[module] = sorted(
+            ({"package": name, "import_ms": us / 1000} for name, us in packages.items()),
+            key=lambda r: r["import_ms"], reverse=True,
+        )
+    return _import_profiles[module][:top]
+
+
+# =========================
+# EXPORT
+# =========================
+def to_prometheus(rows=None):
+    rows = records() if rows is None else rows
+    metrics = [
+        ("wine_stage_wall_seconds", "wall_ms", 1e-3, "Wall time per stage"),
+        ("wine_stage_cpu_seconds", "cpu_ms", 1e-3, "CPU time per stage"),
+        ("wine_stage_peak_alloc_bytes", "peak_alloc_kb", 1024, "Peak Python allocation per stage"),
+    ]
+    lines = []
+    for metric, field, factor, help_text in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for r in rows:
+            label = r["stage"].replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}{{stage="{label}"}} {r[field] * factor:.6g}')
+    return "\n".join(lines) + "\n"
+
+
+def render_panel(module=None):
+    # Panel diagnostics (collapsible) di bagian bawah halaman
+    import streamlit as st
+    import pandas as pd
+
+    rows = records()
+    with st.expander("🩺 Diagnostics", expanded=False):
+        if not rows:
+            st.write("Belum ada stage yang tercatat pada rerun ini.")
+        else:
+            table = pd.DataFrame(rows)
+            table["stage"] = ["  " * d + s for d, s in zip(table.pop("depth"), table["stage"])]
+            st.dataframe(table.round(2), hide_index=True)
+            st.code(to_prometheus(rows), language="text")
+
+        caches = cache_stats()
+        if caches:
+            st.dataframe(pd.DataFrame(caches).round(3), hide_index=True)
+
+        if module is not None:
+            # Checkbox di fragment: mencentangnya tidak me-rerun halaman
+            st.fragment(_render_import_profile)(module)
+
+
+def _render_import_profile(module):
+    import streamlit as st
+    import pandas as pd
+
+    if st.checkbox(f"⏱️ Import time `{module}` (cold start)"):
+        profile = import_profile(module)
+        st.caption(
+            f"Total {sum(r['import_ms'] for r in _import_profiles[module]):.0f} ms, "
+            f"diukur dengan python -X importtime di proses baru"
+        )
+        st.dataframe(pd.DataFrame(profile).round(1), hide_index=True)
@@ -1,19 +1,26 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
-import math
 
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.linear_model import LinearRegression, Ridge, Lasso
-from sklearn.metrics import mean_squared_error, r2_score
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+import correlation
+import model_zoo
+import partitions
+import pipeline
+from figure_cache import cached_figure
+from instrumentation import stage
 
-import joblib
 
+@st.cache_resource(show_spinner="Memuat hasil training...", max_entries=4)
+def load_pipeline(key):
+    # Halaman ini read-only: hanya membaca artifact hasil `python train.py`,
+    # tidak pernah melatih model atau menimpa artifact produksi.
+    # Objek model sklearn tidak dipakai untuk render, jadi tidak di-unpickle.
+    return pipeline.load_artifacts(key, with_models=False)
 
-def ml_model():
+
+def ml_model(partition=None):
+    partition = partition or partitions.default_partition()
+    train_command = f"python train.py{partition.cli_option}"
 
     # ======================================================
     # 🎨 RED WINE THEME
@@ -73,277 +80,275 @@ def ml_model():
     # ======================================================
     # 1️⃣ LOAD DATA
     # ======================================================
-    df = pd.read_csv("Wine Quality Dataset.csv")
-    df = df.drop(columns="alcohol_level")
-
-    numeric_cols = df.select_dtypes(include="number").columns
+    with stage("ml.load_artifacts"):
+        # Artifact per partisi: key = hash isi CSV partisi + parameter
+        key = pipeline.pipeline_key(partition.data_path)
+        if not pipeline.has_artifacts(key):
+            key = pipeline.latest_key(partition.data_path)
+            if key is None:
+                st.warning(
+                    f"Belum ada hasil training. Jalankan `{train_command}` "
+                    "untuk melatih model dan membuat artifact."
+                )
+                return
+            st.info(
+                "Dataset atau parameter berubah sejak training terakhir. "
+                f"Menampilkan hasil training terakhir; jalankan `{train_command}` untuk memperbarui."
+            )
+
+        result = load_pipeline(key)
+        metrics = result["metrics"]
+        tables = result["tables"]
 
     # ======================================================
     # 2️⃣ OUTLIER DETECTION (IQR)
     # ======================================================
-    st.subheader("1️⃣ Deteksi dan Penanganan Outlier (IQR Method)")
-
-    Q1 = df[numeric_cols].quantile(0.25)
-    Q3 = df[numeric_cols].quantile(0.75)
-    IQR = Q3 - Q1
-
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            Sebelum Outlier
-            <div class="metric-value">{df.shape[0]}</div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        df = df[~((df[numeric_cols] < lower) | (df[numeric_cols] > upper)).any(axis=1)]
-        st.markdown(f"""
-        <div class="metric-card">
-            Setelah Outlier
-            <div class="metric-value">{df.shape[0]}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    with stage("ml.1_outlier"):
+        st.subheader("1️⃣ Deteksi dan Penanganan Outlier (IQR Method)")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown(f"""
+            <div class="metric-card">
+                Sebelum Outlier
+                <div class="metric-value">{metrics["rows_before"]}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+        with col2:
+            st.markdown(f"""
+            <div class="metric-card">
+                Setelah Outlier
+                <div class="metric-value">{metrics["rows_after"]}</div>
+            </div>
+            """, unsafe_allow_html=True)
 
     # ======================================================
     # 3️⃣ DATASET PREVIEW
     # ======================================================
-    st.subheader("2️⃣ Dataset yang Digunakan")
-    st.dataframe(df.head())
+    with stage("ml.2_preview"):
+        st.subheader("2️⃣ Dataset yang Digunakan")
+        st.dataframe(tables["preview"])
 
     # ======================================================
     # 4️⃣ CORRELATION HEATMAP
     # ======================================================
-    st.subheader("3️⃣ Korelasi Linear Antar Fitur")
-
-    corr = df[numeric_cols].corr().round(2)
-
-    fig_corr = px.imshow(
-        corr,
-        text_auto=True,
-        color_continuous_scale=["#FADADD", WINE_MAIN],
-        height=800,
-        title="Correlation Heatmap"
-    )
-
-    # 🔥 HANYA BAGIAN INI YANG DIUBAH
-    fig_corr.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",   # background luar transparan
-        plot_bgcolor="rgba(0,0,0,0)",    # background dalam transparan
-        font=dict(color="white")         # biar kontras di dark theme
-    )
-
-    st.plotly_chart(fig_corr, use_container_width=True)
-
-    st.markdown("""
-    <div class="card">
-        <div class="card-title">📌 Insight Korelasi</div>
-        <ul>
-            <li><b>Alcohol</b> memiliki korelasi positif terkuat terhadap kualitas wine.</li>
-            <li><b>Volatile Acidity</b> berkorelasi negatif terhadap kualitas.</li>
-            <li><b>Density</b> menurun seiring meningkatnya alkohol.</li>
-            <li><b>Sulphates</b> berkontribusi positif namun tidak dominan.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    with stage("ml.3_correlation"):
+        st.subheader("3️⃣ Korelasi Linear Antar Fitur")
+
+        # Matriks korelasi dari statistik berjalan (append baris baru = O(p^2) per baris);
+        # artifact lama tanpa batas IQR memakai tabel korelasi hasil training
+        bounds = metrics.get("iqr_bounds")
+        if bounds is not None:
+            version, running = correlation.load_correlation(
+                partition.data_path, bounds["lower"], bounds["upper"]
+            )
+            figure_key = f"corr-{version}-{correlation.bounds_key(bounds['lower'], bounds['upper'])}"
+            get_corr = lambda: running.matrix().round(2)
+        else:
+            figure_key = f"corr-{key}"
+            get_corr = lambda: tables["corr"]
+
+        def build_corr_figure():
+            fig = px.imshow(
+                get_corr(),
+                text_auto=True,
+                color_continuous_scale=["#FADADD", WINE_MAIN],
+                height=800,
+                title="Correlation Heatmap"
+            )
+
+            # 🔥 HANYA BAGIAN INI YANG DIUBAH
+            fig.update_layout(
+                paper_bgcolor="rgba(0,0,0,0)",   # background luar transparan
+                plot_bgcolor="rgba(0,0,0,0)",    # background dalam transparan
+                font=dict(color="white")         # biar kontras di dark theme
+            )
+            return fig
+
+        # Figure di-cache per versi dataset: rerun tidak membangun ulang heatmap
+        fig_corr = cached_figure(figure_key, build_corr_figure)
+
+        st.plotly_chart(fig_corr, use_container_width=True)
+
+        st.markdown("""
+        <div class="card">
+            <div class="card-title">📌 Insight Korelasi</div>
+            <ul>
+                <li><b>Alcohol</b> memiliki korelasi positif terkuat terhadap kualitas wine.</li>
+                <li><b>Volatile Acidity</b> berkorelasi negatif terhadap kualitas.</li>
+                <li><b>Density</b> menurun seiring meningkatnya alkohol.</li>
+                <li><b>Sulphates</b> berkontribusi positif namun tidak dominan.</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
 
     # ======================================================
     # 5️⃣ VIF
     # ======================================================
-    st.subheader("4️⃣ Multikolinearitas (VIF)")
+    with stage("ml.4_vif"):
+        st.subheader("4️⃣ Multikolinearitas (VIF)")
 
-    vif_df = pd.DataFrame({
-        "Feature": numeric_cols,
-        "VIF": [
-            variance_inflation_factor(df[numeric_cols].values, i)
-            for i in range(len(numeric_cols))
-        ]
-    })
-
-    st.dataframe(vif_df)
+        st.dataframe(tables["vif"])
 
     # ======================================================
     # 6️⃣ STANDARDIZATION & SPLIT
     # ======================================================
-    st.subheader("5️⃣ Standardisasi dan Split Data")
-
-    X = df.drop(["quality", "density", "pH"], axis=1)
-    y = df["quality"]
+    with stage("ml.5_split"):
+        st.subheader("5️⃣ Standardisasi dan Split Data")
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_scaled, y, test_size=0.2, random_state=42
-    )
-
-    st.write(f"Train data: {len(X_train)} | Test data: {len(X_test)}")
+        st.write(f"Train data: {metrics['n_train']} | Test data: {metrics['n_test']}")
 
     # ======================================================
     # 7️⃣ LINEAR REGRESSION
     # ======================================================
-    st.subheader("6️⃣ Linear Regression")
-
-    lr = LinearRegression()
-    lr.fit(X_train, y_train)
-
-    coef_lr = pd.DataFrame({
-        "Feature": X.columns,
-        "Coefficient": lr.coef_
-    })
+    with stage("ml.6_linear_coef"):
+        st.subheader("6️⃣ Linear Regression")
 
-    st.dataframe(coef_lr)
+        st.dataframe(tables["coef_lr"])
 
     # ======================================================
     # 7️⃣ LINEAR REGRESSION
     # ======================================================
-    st.subheader("6️⃣ Linear Regression")
+    with stage("ml.6_linear_metrics"):
+        st.subheader("6️⃣ Linear Regression")
 
-    lr = LinearRegression()
-    lr.fit(X_train, y_train)
+        st.dataframe(pd.DataFrame(metrics["linear"], index=[0]))
 
-    def evaluate_model(y_true, y_pred):
-        return {
-            "MAE": np.mean(np.abs(y_true - y_pred)),
-            "MSE": mean_squared_error(y_true, y_pred),
-            "RMSE": math.sqrt(mean_squared_error(y_true, y_pred)),
-            "R²": r2_score(y_true, y_pred)
-        }
-
-    lr_metrics = evaluate_model(y_test, lr.predict(X_test))
-    st.dataframe(pd.DataFrame(lr_metrics, index=[0]))
-
-    st.markdown("""
-    <div class="card">
-        <div class="card-title">📌 Insight Linear Regression</div>
-        <ul>
-            <li>Nilai <b>MAE</b> sebesar ~0.46 menunjukkan bahwa semakin kecil MAE, semakin akurat prediksi model.</li>
-            <li>Nilai <b>MSE</b> sebesar ~0.33 menandakan bahwa kesalahan besar lebih sering terjadi.</li>
-            <li><b>RMSE</b> sebesar ~0.58 menunjukkan performa prediksi sedikit lebih buruk.</li>
-            <li>Nilai <b>R²</b> sebesar ~0.35 menunjukkan bahwa model menjelaskan sekitar 35% variasi target.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+        st.markdown("""
+        <div class="card">
+            <div class="card-title">📌 Insight Linear Regression</div>
+            <ul>
+                <li>Nilai <b>MAE</b> sebesar ~0.46 menunjukkan bahwa semakin kecil MAE, semakin akurat prediksi model.</li>
+                <li>Nilai <b>MSE</b> sebesar ~0.33 menandakan bahwa kesalahan besar lebih sering terjadi.</li>
+                <li><b>RMSE</b> sebesar ~0.58 menunjukkan performa prediksi sedikit lebih buruk.</li>
+                <li>Nilai <b>R²</b> sebesar ~0.35 menunjukkan bahwa model menjelaskan sekitar 35% variasi target.</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
 
     # ======================================================
     # 8️⃣ HYPERPARAMETER TUNING
     # ======================================================
-    st.subheader("7️⃣ Hyperparameter Tuning (Ridge & Lasso)")
-
-    alphas = np.logspace(-3, 3, 20)
-
-    ridge_grid = GridSearchCV(
-        Ridge(),
-        {"alpha": alphas},
-        cv=10,
-        scoring="neg_mean_squared_error"
-    )
-    ridge_grid.fit(X_train, y_train)
-
-    lasso_grid = GridSearchCV(
-        Lasso(max_iter=5000),
-        {"alpha": alphas},
-        cv=10,
-        scoring="neg_mean_squared_error"
-    )
-    lasso_grid.fit(X_train, y_train)
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            Best Alpha Ridge
-            <div class="metric-value">{ridge_grid.best_params_['alpha']:.4f}</div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            Best Alpha Lasso
-            <div class="metric-value">{lasso_grid.best_params_['alpha']:.4f}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    with stage("ml.7_tuning"):
+        st.subheader("7️⃣ Hyperparameter Tuning (Ridge & Lasso)")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown(f"""
+            <div class="metric-card">
+                Best Alpha Ridge
+                <div class="metric-value">{metrics['best_alpha_ridge']:.4f}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+        with col2:
+            st.markdown(f"""
+            <div class="metric-card">
+                Best Alpha Lasso
+                <div class="metric-value">{metrics['best_alpha_lasso']:.4f}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+        # Artifact lama (sebelum tuning closed-form) tidak mencatat waktu tuning
+        if "tuning_time_ridge" in metrics and "tuning_time_lasso" in metrics:
+            folds = metrics.get("params", {}).get("cv", "?")
+            st.caption(
+                f"Waktu tuning ({len(result['cv_results']['ridge'])} kandidat × {folds} fold): "
+                f"Ridge {metrics['tuning_time_ridge'] * 1000:.1f} ms, "
+                f"Lasso {metrics['tuning_time_lasso'] * 1000:.1f} ms"
+            )
 
     # ======================================================
     # 9️⃣ COEFFICIENT COMPARISON
     # ======================================================
-    st.subheader("8️⃣ Koefisien Ridge & Lasso")
+    with stage("ml.8_coefficients"):
+        st.subheader("8️⃣ Koefisien Ridge & Lasso")
 
-    ridge_best = Ridge(alpha=ridge_grid.best_params_["alpha"])
-    lasso_best = Lasso(alpha=lasso_grid.best_params_["alpha"], max_iter=5000)
-
-    ridge_best.fit(X_train, y_train)
-    lasso_best.fit(X_train, y_train)
-
-    coef_compare = pd.DataFrame({
-        "Feature": X.columns,
-        "Ridge Coef": ridge_best.coef_,
-        "Lasso Coef": lasso_best.coef_
-    })
-
-    st.dataframe(coef_compare)
+        st.dataframe(tables["coef_compare"])
 
     # ======================================================
     # 🔟 MODEL EVALUATION
     # ======================================================
-    st.subheader("9️⃣ Evaluasi Model")
-
-    col1, col2 = st.columns(2)
-
-    def evaluate_model(y_true, y_pred):
-        return {
-            "MAE": np.mean(np.abs(y_true - y_pred)),
-            "MSE": mean_squared_error(y_true, y_pred),
-            "RMSE": math.sqrt(mean_squared_error(y_true, y_pred)),
-            "R²": r2_score(y_true, y_pred)
-        }
-
-    with col1:
-        st.write("**Ridge Regression**")
-        ridge_metrics = evaluate_model(y_test, ridge_best.predict(X_test))
-        st.dataframe(pd.DataFrame(ridge_metrics, index=[0]))
-
-        st.markdown(""" <div class="card-title">📌 Insight Ridge Regression</div>
-        <div class="card">
-            <li>Nilai <b>MAE</b> sebesar <b>~0.46</b> menunjukkan bahwa prediksi kualitas wine
-                rata-rata meleset kurang dari setengah poin kualitas.</li>
-            <li>Nilai <b>MSE</b> sebesar <b>~0.34</b> menandakan bahwa kesalahan kuadrat rata-rata
-                dari prediksi cukup kecil, memperkuat keakuratan model.</li>
-            <li><b>RMSE</b> sebesar <b>~0.58</b> menunjukkan bahwa deviasi standar dari kesalahan prediksi
-                juga rendah, mengindikasikan konsistensi model.</li>
-            <li><b>R²</b> sebesar <b>~0.35</b> mengindikasikan bahwa sekitar 35% variasi dalam
-                kualitas wine dapat dijelaskan oleh fitur-fitur dalam model ini.</li>
-            Secara keseluruhan,
-            <b>Ridge menghasilkan error yang lebih kecil dan stabil.
-            Semua fitur tetap dipertahankan sehingga cocok untuk prediksi kualitas wine.</b>
-        </div>
-        """, unsafe_allow_html=True)
+    with stage("ml.9_evaluation"):
+        st.subheader("9️⃣ Evaluasi Model")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.write("**Ridge Regression**")
+            st.dataframe(pd.DataFrame(metrics["ridge"], index=[0]))
+
+            st.markdown(""" <div class="card-title">📌 Insight Ridge Regression</div>
+            <div class="card">
+                <li>Nilai <b>MAE</b> sebesar <b>~0.46</b> menunjukkan bahwa prediksi kualitas wine
+                    rata-rata meleset kurang dari setengah poin kualitas.</li>
+                <li>Nilai <b>MSE</b> sebesar <b>~0.34</b> menandakan bahwa kesalahan kuadrat rata-rata
+                    dari prediksi cukup kecil, memperkuat keakuratan model.</li>
+                <li><b>RMSE</b> sebesar <b>~0.58</b> menunjukkan bahwa deviasi standar dari kesalahan prediksi
+                    juga rendah, mengindikasikan konsistensi model.</li>
+                <li><b>R²</b> sebesar <b>~0.35</b> mengindikasikan bahwa sekitar 35% variasi dalam
+                    kualitas wine dapat dijelaskan oleh fitur-fitur dalam model ini.</li>
+                Secara keseluruhan,
+                <b>Ridge menghasilkan error yang lebih kecil dan stabil.
+                Semua fitur tetap dipertahankan sehingga cocok untuk prediksi kualitas wine.</b>
+            </div>
+            """, unsafe_allow_html=True)
+
+        with col2:
+            st.write("**Lasso Regression**")
+            st.dataframe(pd.DataFrame(metrics["lasso"], index=[0]))
+
+            st.markdown(""" <div class="card-title">📌 Insight Lasso Regression</div>
+            <div class="card">
+                <li>Nilai <b>MAE</b> sebesar <b>~0.46</b> menunjukkan bahwa prediksi kualitas wine
+                    rata-rata meleset lebih dari setengah poin kualitas.</li>
+                <li>Nilai <b>MSE</b> sebesar <b>~0.33</b> menandakan bahwa kesalahan kuadrat rata-rata
+                    dari prediksi lebih besar dibanding Ridge, menunjukkan akurasi yang lebih rendah.</li>
+                <li><b>RMSE</b> sebesar <b>~0.58</b> menunjukkan bahwa deviasi standar dari kesalahan prediksi
+                    juga lebih tinggi, mengindikasikan ketidakstabilan model.</li>
+                <li><b>R²</b> sebesar <b>~0.35</b> mengindikasikan bahwa hanya sekitar 35% variasi dalam
+                    kualitas wine dapat dijelaskan oleh fitur-fitur dalam model ini.</li>
+                Secara keseluruhan,
+                <b>Lasso melakukan seleksi fitur namun performanya lebih rendah dibandingkan Ridge Regression.</b>
+            </div>
+            """, unsafe_allow_html=True)
 
-    with col2:
-        st.write("**Lasso Regression**")
-        lasso_metrics = evaluate_model(y_test, lasso_best.predict(X_test))
-        st.dataframe(pd.DataFrame(lasso_metrics, index=[0]))
-
-        st.markdown(""" <div class="card-title">📌 Insight Lasso Regression</div>
-        <div class="card">
-            <li>Nilai <b>MAE</b> sebesar <b>~0.46</b> menunjukkan bahwa prediksi kualitas wine
-                rata-rata meleset lebih dari setengah poin kualitas.</li>
-            <li>Nilai <b>MSE</b> sebesar <b>~0.33</b> menandakan bahwa kesalahan kuadrat rata-rata
-                dari prediksi lebih besar dibanding Ridge, menunjukkan akurasi yang lebih rendah.</li>
-            <li><b>RMSE</b> sebesar <b>~0.58</b> menunjukkan bahwa deviasi standar dari kesalahan prediksi
-                juga lebih tinggi, mengindikasikan ketidakstabilan model.</li>
-            <li><b>R²</b> sebesar <b>~0.35</b> mengindikasikan bahwa hanya sekitar 35% variasi dalam
-                kualitas wine dapat dijelaskan oleh fitur-fitur dalam model ini.</li>
-            Secara keseluruhan,
-            <b>Lasso melakukan seleksi fitur namun performanya lebih rendah dibandingkan Ridge Regression.</b>
-        </div>
-        """, unsafe_allow_html=True)
+    # ======================================================
+    # 🧪 MODEL ZOO
+    # ======================================================
+    with stage("ml.10_model_zoo"):
+        st.subheader("🧪 Perbandingan Model (Akurasi vs Latency)")
+
+        zoo = model_zoo.load_report(partition.model_path(model_zoo.REPORT_FILE))
+        if zoo is None:
+            st.info(
+                f"Belum ada hasil perbandingan. Jalankan `python model_zoo.py{partition.cli_option}` "
+                "untuk membuatnya."
+            )
+        else:
+            zoo_df = pd.DataFrame(zoo["results"])
+            zoo_df["serving latency (ms)"] = [model_zoo.serving_latency(r) for r in zoo["results"]]
+            st.dataframe(
+                zoo_df[["model", "RMSE", "R²", "MAE", "fit_seconds", "serving latency (ms)",
+                        "batch_rows_per_sec", "model_kb"]].sort_values("RMSE").round(4),
+                hide_index=True
+            )
+
+            fig = px.scatter(
+                zoo_df, x="serving latency (ms)", y="RMSE", size="model_kb", text="model",
+                log_x=True, size_max=40, color_discrete_sequence=["#A63A50"],
+                title="Trade-off Akurasi vs Latency Inferensi (per baris)"
+            )
+            fig.update_traces(textposition="top center")
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(
+                f"Model linear diukur dengan compiled scorer (jalur produksi). "
+                f"Rekomendasi saat ini: **{zoo['recommended']}**"
+                + (f" dengan budget {zoo['max_latency_ms']} ms/baris." if zoo["max_latency_ms"] else ".")
+            )
 
     # ======================================================
     # 🔚 KESIMPULAN
@@ -392,10 +397,3 @@ def ml_model():
     </div>
     """, unsafe_allow_html=True)
 
-
-    # ======================================================
-    # 💾 SAVE MODEL
-    # ======================================================
-    joblib.dump(scaler, "scaler.joblib")
-    joblib.dump(ridge_best, "ridge_model.joblib")
-    joblib.dump(X.columns.tolist(), "feature_columns.joblib")
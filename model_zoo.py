@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import pickle
+import statistics
+import time
+import warnings
+
+import numpy as np
+from joblib import Parallel, delayed
+
+import feature_store
+import pipeline
+import scorer
+
+
+# =========================
+# CONFIG
+# =========================
+REPORT_FILE = "model_zoo.json"
+ALPHAS = np.asarray(pipeline.DEFAULT_PARAMS["alphas"])
+RANDOM_STATE = pipeline.DEFAULT_PARAMS["random_state"]
+LINEAR_FAMILIES = {"ridge", "lasso", "elasticnet"}
+
+# Jumlah thread BLAS/OpenMP per worker, supaya worker paralel tidak saling berebut core
+THREADS_PER_WORKER = 1
+
+
+def make_model(name):
+    from sklearn.linear_model import RidgeCV, LassoCV, ElasticNetCV
+    from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+
+    factories = {
+        "ridge": lambda: RidgeCV(alphas=ALPHAS),
+        "lasso": lambda: LassoCV(alphas=ALPHAS, cv=5, max_iter=5000, random_state=RANDOM_STATE),
+        "elasticnet": lambda: ElasticNetCV(
+            l1_ratio=[0.2, 0.5, 0.8], alphas=ALPHAS, cv=5, max_iter=5000, random_state=RANDOM_STATE
+        ),
+        "random_forest": lambda: RandomForestRegressor(
+            n_estimators=200, min_samples_leaf=3, random_state=RANDOM_STATE, n_jobs=THREADS_PER_WORKER
+        ),
+        "hist_gradient_boosting": lambda: HistGradientBoostingRegressor(random_state=RANDOM_STATE),
+    }
+    return factories[name]()
+
+
+MODELS = ["ridge", "lasso", "elasticnet", "random_forest", "hist_gradient_boosting"]
+
+
+# =========================
+# TRAINING (satu proses per model)
+# =========================
+def _fit_one(name, store_path):
+    # Worker hanya menerima path: matriks fitur dibuka sebagai memmap read-only,
+    # jadi semua worker membaca page cache yang sama tanpa salinan hasil pickle
+    from threadpoolctl import threadpool_limits
+
+    warnings.filterwarnings("ignore")
+    store = feature_store.FeatureStore(store_path)
+    X_train, y_train = store.train()
+    X_test, y_test = store.test()
+
+    with threadpool_limits(limits=THREADS_PER_WORKER):
+        model = make_model(name)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        metrics = pipeline.evaluate_model(np.asarray(y_test), model.predict(X_test))
+
+    return name, model, fit_seconds, metrics
+
+
+# =========================
+# LATENCY & UKURAN (diukur berurutan di proses utama, tanpa kontensi)
+# =========================
+def _median_time(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def profile_model(name, model, store, repeats=200):
+    X_test, _ = store.test()
+    row = np.array(X_test[:1])
+    batch = np.array(X_test)
+
+    entry = {
+        "latency_ms": _median_time(lambda: model.predict(row), repeats) * 1000,
+        "batch_rows_per_sec": len(batch) / _median_time(lambda: model.predict(batch), 5),
+        "model_kb": len(pickle.dumps(model)) / 1024,
+        "scorer_latency_ms": None,
+    }
+
+    # Model linear bisa dilipat ke compiled scorer (jalur produksi Prediction App)
+    if name in LINEAR_FAMILIES:
+        weights = scorer.compile_scorer(store.scaler(), model)
+        raw = store.unscale(row)[0]
+        entry["scorer_latency_ms"] = _median_time(lambda: scorer.score(weights, raw), repeats) * 1000
+        # Yang dikirim ke produksi hanya array scorer, bukan objek sklearn
+        entry["model_kb"] = weights.nbytes / 1024
+    return entry
+
+
+def serving_latency(entry):
+    return entry["scorer_latency_ms"] if entry["scorer_latency_ms"] is not None else entry["latency_ms"]
+
+
+def select(results, max_latency_ms=None):
+    # Model dengan RMSE terendah yang masih masuk budget latency inferensi
+    candidates = [r for r in results if max_latency_ms is None or serving_latency(r) <= max_latency_ms]
+    return min(candidates, key=lambda r: r["RMSE"]) if candidates else None
+
+
+def run(data_path=pipeline.DATA_PATH, models=MODELS, n_jobs=-1, max_latency_ms=None):
+    params = pipeline.DEFAULT_PARAMS
+    store = feature_store.load_store(
+        data_path, pipeline.FEATURES, test_size=params["test_size"], random_state=params["random_state"]
+    )
+
+    start = time.perf_counter()
+    fitted = Parallel(n_jobs=n_jobs)(delayed(_fit_one)(name, store.path) for name in models)
+    wall = time.perf_counter() - start
+
+    results = []
+    for name, model, fit_seconds, metrics in fitted:
+        results.append({
+            "model": name,
+            **metrics,
+            "fit_seconds": fit_seconds,
+            **profile_model(name, model, store),
+        })
+
+    best = select(results, max_latency_ms)
+    return {
+        "data_version": store.meta["data_version"],
+        "feature_store": store.path,
+        "n_train": store.n_train,
+        "n_test": store.meta["n_test"],
+        "wall_seconds": wall,
+        "max_latency_ms": max_latency_ms,
+        "recommended": best["model"] if best else None,
+        "results": results,
+    }
+
+
+def save_report(report, path=REPORT_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_report(path=REPORT_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# =========================
+# CLI: python model_zoo.py [--max-latency-ms 0.05]
+# =========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan beberapa keluarga model secara paralel")
+    parser.add_argument("--data", help="path CSV (default: CSV milik partisi)")
+    parser.add_argument("--partition", help="id partisi; laporan ditulis ke models/<partisi>/")
+    parser.add_argument("--models", nargs="+", default=MODELS, choices=MODELS)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--max-latency-ms", type=float, help="budget latency inferensi per baris")
+    parser.add_argument("--output", help=f"default: {REPORT_FILE} di folder model partisi")
+    args = parser.parse_args()
+
+    import partitions
+
+    partition = partitions.get_partition(args.partition)
+    output = args.output or partition.model_path(REPORT_FILE)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    report = run(args.data or partition.data_path, args.models, args.n_jobs, args.max_latency_ms)
+    save_report(report, output)
+
+    print(f"{'model':<24}{'RMSE':>8}{'R²':>8}{'fit s':>8}{'latency ms':>12}{'rows/s':>12}{'KB':>10}")
+    for r in sorted(report["results"], key=lambda r: r["RMSE"]):
+        print(
+            f"{r['model']:<24}{r['RMSE']:>8.4f}{r['R²']:>8.4f}{r['fit_seconds']:>8.2f}"
+            f"{serving_latency(r):>12.4f}{r['batch_rows_per_sec']:>12,.0f}{r['model_kb']:>10.1f}"
+        )
+    print(f"Rekomendasi: {report['recommended']} (paralel {report['wall_seconds']:.2f} s)")
@@ -0,0 +1,188 @@
+import argparse
+import time
+
+import numpy as np
+
+import dataset
+
+
+# =========================
+# CONFIG
+# =========================
+NUMERIC_COLUMNS = dataset.CHEMISTRY_COLUMNS + ["quality"]
+QUANTILES = (0.25, 0.75)
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_K = 400
+
+
+# =========================
+# KLL QUANTILE SKETCH
+# =========================
+class KLLSketch:
+    # Sketch kuantil yang bisa di-merge. Memori O(k log(n/k)), error rank ~O(1/k).
+    # Level h menyimpan item dengan bobot 2^h; level penuh disortir lalu
+    # setengah itemnya (ganjil/genap acak) dipromosikan ke level berikutnya.
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                keep = items[len(items) - len(items) % 2:]
+                items = items[:len(items) - len(items) % 2]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = keep
+                # Kapasitas bergantung pada jumlah level; cek ulang dari bawah
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        items = np.concatenate(self.levels)
+        if not len(items):
+            # Belum ada nilai (CSV tanpa baris)
+            return float("nan")
+        weights = np.concatenate([
+            np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)
+        ])
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, q * cumulative[-1])
+        return float(items[order][min(idx, len(items) - 1)])
+
+    def size(self):
+        return sum(len(level) for level in self.levels)
+
+
+# =========================
+# PASS 1: estimasi kuartil
+# =========================
+def sketch_columns(path, columns=NUMERIC_COLUMNS, chunksize=DEFAULT_CHUNKSIZE, k=DEFAULT_K):
+    sketches = {col: KLLSketch(k) for col in columns}
+    for chunk in dataset.read_csv(path, usecols=columns, chunksize=chunksize):
+        for col in columns:
+            sketches[col].update(chunk[col].to_numpy())
+    return sketches
+
+
+def iqr_bounds(sketches):
+    lower, upper, quartiles = {}, {}, {}
+    for col, sketch in sketches.items():
+        q1, q3 = (sketch.quantile(q) for q in QUANTILES)
+        iqr = q3 - q1
+        quartiles[col] = (q1, q3)
+        lower[col] = q1 - 1.5 * iqr
+        upper[col] = q3 + 1.5 * iqr
+    return quartiles, lower, upper
+
+
+# =========================
+# PASS 2: filter + ukur error rank sketch
+# =========================
+def filter_csv(source, destination, quartiles, lower, upper, chunksize=DEFAULT_CHUNKSIZE):
+    columns = list(quartiles)
+    lo = np.array([lower[c] for c in columns])
+    hi = np.array([upper[c] for c in columns])
+    est = np.array([quartiles[c] for c in columns])          # (p, 2)
+
+    # Jumlah nilai < dan <= estimasi kuartil, untuk menghitung rank eksaknya
+    below = np.zeros_like(est)
+    at_or_below = np.zeros_like(est)
+    rows_in = rows_out = 0
+
+    for i, chunk in enumerate(dataset.read_csv(source, chunksize=chunksize)):
+        values = chunk[columns].to_numpy(dtype=np.float64)
+
+        below += (values[:, :, None] < est[None]).sum(axis=0)
+        at_or_below += (values[:, :, None] <= est[None]).sum(axis=0)
+
+        keep = ~((values < lo) | (values > hi)).any(axis=1)
+        chunk[keep].to_csv(destination, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+        rows_in += len(chunk)
+        rows_out += int(keep.sum())
+
+    if rows_in == 0:
+        # CSV hanya header: tetap tulis file tujuan (header saja), tanpa error rank
+        dataset.read_csv(source, nrows=0).to_csv(destination, index=False)
+        rank_error = np.zeros_like(est)
+    else:
+        # Error rank = jarak q ke interval rank [below, at_or_below] / n
+        q = np.array(QUANTILES)[None, :]
+        rank_error = np.maximum(0, np.maximum(below / rows_in - q, q - at_or_below / rows_in))
+
+    return {
+        "rows_before": rows_in,
+        "rows_after": rows_out,
+        "rank_error": {
+            col: dict(zip(["Q1", "Q3"], map(float, err)))
+            for col, err in zip(columns, rank_error)
+        },
+    }
+
+
+def streaming_iqr_filter(source, destination, chunksize=DEFAULT_CHUNKSIZE, k=DEFAULT_K):
+    start = time.perf_counter()
+    sketches = sketch_columns(source, chunksize=chunksize, k=k)
+    quartiles, lower, upper = iqr_bounds(sketches)
+
+    report = filter_csv(source, destination, quartiles, lower, upper, chunksize=chunksize)
+    report.update({
+        "quartiles": quartiles,
+        "lower": lower,
+        "upper": upper,
+        "max_rank_error": max(max(e.values()) for e in report["rank_error"].values()),
+        "sketch_items": max(s.size() for s in sketches.values()),
+        "seconds": time.perf_counter() - start,
+    })
+    return report
+
+
+# =========================
+# CLI: python outliers.py input.csv cleaned.csv
+# =========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming IQR outlier filter (dua pass, memori konstan)")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="ukuran sketch KLL")
+    args = parser.parse_args()
+
+    report = streaming_iqr_filter(args.input, args.output, chunksize=args.chunksize, k=args.k)
+    print(
+        f"{report['rows_before']} -> {report['rows_after']} baris dalam {report['seconds']:.2f} s "
+        f"(max rank error sketch {report['max_rank_error']:.4%}, "
+        f"{report['sketch_items']} item per kolom)"
+    )
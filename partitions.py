@@ -0,0 +1,180 @@
+import argparse
+import os
+import shutil
+import tempfile
+
+
+# =========================
+# CONFIG
+# =========================
+# Layout partisi (gaya Hive), satu CSV per partisi:
+#   data/source=<kebun>/varietal=<varietas>/vintage=<tahun>/data.csv
+# Artifact produksi tiap partisi ada di folder paralel di bawah models/.
+# Dataset lama (Wine Quality Dataset.csv + artifact di root) tetap menjadi
+# partisi "default".
+PARTITION_ROOT = "data"
+MODEL_ROOT = "models"
+PARTITION_KEYS = ["source", "varietal", "vintage"]
+DATA_FILE = "data.csv"
+DEFAULT_ID = "default"
+# = dataset.DATA_PATH; tidak di-import karena dataset memuat pandas,
+# sedangkan app.py dan Prediction App memakai modul ini tanpa pandas
+DEFAULT_DATA_PATH = "Wine Quality Dataset.csv"
+
+
+class Partition:
+
+    def __init__(self, id, data_path, model_dir, labels):
+        self.id = id
+        self.data_path = data_path
+        self.model_dir = model_dir
+        self.labels = labels
+
+    @property
+    def label(self):
+        if not self.labels:
+            return f"{os.path.splitext(os.path.basename(self.data_path))[0]} (default)"
+        return " / ".join(self.labels[k] for k in PARTITION_KEYS)
+
+    @property
+    def cli_option(self):
+        # Argumen CLI (train.py / model_zoo.py) untuk partisi ini
+        return "" if self.id == DEFAULT_ID else f" --partition {self.id}"
+
+    def model_path(self, filename):
+        return os.path.join(self.model_dir, filename)
+
+
+def default_partition():
+    return Partition(DEFAULT_ID, DEFAULT_DATA_PATH, ".", {})
+
+
+def _partition(labels, root=PARTITION_ROOT, model_root=MODEL_ROOT):
+    parts = [f"{k}={labels[k]}" for k in PARTITION_KEYS]
+    return Partition(
+        "/".join(parts),
+        os.path.join(root, *parts, DATA_FILE),
+        os.path.join(model_root, *parts),
+        labels,
+    )
+
+
+# =========================
+# DISCOVERY (hanya listing folder, tidak membaca isi data)
+# =========================
+def _scan(path, depth, labels):
+    key = PARTITION_KEYS[depth]
+    try:
+        entries = sorted(os.scandir(path), key=lambda e: e.name)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        name, _, value = entry.name.partition("=")
+        if not entry.is_dir() or name != key or not value:
+            continue
+        found = {**labels, key: value}
+        if depth + 1 < len(PARTITION_KEYS):
+            yield from _scan(entry.path, depth + 1, found)
+        elif os.path.exists(os.path.join(entry.path, DATA_FILE)):
+            yield found
+
+
+def discover(root=PARTITION_ROOT, model_root=MODEL_ROOT):
+    found = []
+    if os.path.exists(DEFAULT_DATA_PATH):
+        found.append(default_partition())
+    found.extend(_partition(labels, root, model_root) for labels in _scan(root, 0, {}))
+    return found
+
+
+def get_partition(partition_id, root=PARTITION_ROOT, model_root=MODEL_ROOT):
+    if partition_id in (None, DEFAULT_ID):
+        return default_partition()
+    labels = dict(part.split("=", 1) for part in partition_id.split("/"))
+    if sorted(labels) != sorted(PARTITION_KEYS):
+        raise ValueError(f"Partisi tidak valid: {partition_id}")
+    partition = _partition(labels, root, model_root)
+    if not os.path.exists(partition.data_path):
+        raise ValueError(f"Partisi tidak ditemukan: {partition_id}")
+    return partition
+
+
+# =========================
+# IMPORT DATA KE LAYOUT PARTISI
+# =========================
+def add(csv_path, labels, root=PARTITION_ROOT):
+    # Salin satu CSV (kolom sama dengan dataset utama) sebagai satu partisi
+    partition = _partition(labels, root)
+    os.makedirs(os.path.dirname(partition.data_path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(partition.data_path))
+    os.close(fd)
+    shutil.copyfile(csv_path, tmp)
+    os.replace(tmp, partition.data_path)
+    return partition
+
+
+def split(csv_path, root=PARTITION_ROOT, chunksize=200_000):
+    # CSV gabungan dengan kolom source/varietal/vintage -> satu file per partisi.
+    # Dibaca per chunk; file ditulis di folder staging lalu dipindah atomik.
+    import pandas as pd
+
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".split-", dir=root)
+    written = {}
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype={k: str for k in PARTITION_KEYS}):
+            for values, group in chunk.groupby(PARTITION_KEYS, sort=False):
+                labels = dict(zip(PARTITION_KEYS, values))
+                partition = _partition(labels, staging)
+                first = partition.id not in written
+                os.makedirs(os.path.dirname(partition.data_path), exist_ok=True)
+                group.drop(columns=PARTITION_KEYS).to_csv(
+                    partition.data_path, mode="w" if first else "a", header=first, index=False
+                )
+                written[partition.id] = labels
+
+        partitions = []
+        for labels in written.values():
+            partition = _partition(labels, root)
+            os.makedirs(os.path.dirname(partition.data_path), exist_ok=True)
+            os.replace(_partition(labels, staging).data_path, partition.data_path)
+            partitions.append(partition)
+        return partitions
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+# =========================
+# CLI
+# =========================
+# python partitions.py list
+# python partitions.py add kebun_a_red_2019.csv --source kebun_a --varietal red --vintage 2019
+# python partitions.py split estate.csv   (CSV punya kolom source, varietal, vintage)
+if __name__ == "__main__":
+    import registry
+
+    parser = argparse.ArgumentParser(description="Kelola dataset per partisi (source/varietal/vintage)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list")
+
+    add_parser = commands.add_parser("add")
+    add_parser.add_argument("csv")
+    for key in PARTITION_KEYS:
+        add_parser.add_argument(f"--{key}", required=True)
+
+    split_parser = commands.add_parser("split")
+    split_parser.add_argument("csv")
+
+    args = parser.parse_args()
+
+    if args.command == "add":
+        partitions = [add(args.csv, {k: getattr(args, k) for k in PARTITION_KEYS})]
+    elif args.command == "split":
+        partitions = split(args.csv)
+    else:
+        partitions = discover()
+
+    for partition in partitions:
+        trained = registry.ModelRegistry(partition.model_dir).has_artifacts()
+        print(f"{partition.id:<50} {partition.data_path:<60} {'trained' if trained else '-'}")
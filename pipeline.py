@@ -0,0 +1,434 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import joblib
+
+import bootstrap
+import dataset
+import registry
+import scorer
+
+# sklearn / scipy (lewat tuning dan vif) baru di-import di dalam train():
+# halaman Streamlit yang hanya membaca artifact tidak perlu memuatnya
+
+
+# =========================
+# CONFIG
+# =========================
+DATA_PATH = dataset.DATA_PATH
+ARTIFACT_ROOT = "artifacts"
+
+# Naikkan angka ini setiap kali logika training berubah,
+# supaya artifact lama tidak dipakai lagi.
+PIPELINE_VERSION = 5
+
+DEFAULT_PARAMS = {
+    "alphas": np.logspace(-3, 3, 20).tolist(),
+    "cv": 10,
+    "test_size": 0.2,
+    "random_state": 42,
+    "lasso_max_iter": 5000,
+    # Jumlah model bootstrap untuk interval prediksi (0 = nonaktif)
+    "bootstrap_models": bootstrap.DEFAULT_MODELS,
+}
+
+DROP_FEATURES = ["quality", "density", "pH"]
+FEATURES = [col for col in dataset.CHEMISTRY_COLUMNS if col not in DROP_FEATURES]
+
+MODEL_FILES = {
+    "scaler": "scaler.joblib",
+    "linear": "linear_model.joblib",
+    "ridge": "ridge_model.joblib",
+    "lasso": "lasso_model.joblib",
+}
+
+
+# =========================
+# VERSIONING
+# =========================
+def pipeline_key(data_path=DATA_PATH, params=None):
+    params = DEFAULT_PARAMS if params is None else params
+    h = hashlib.sha256()
+    h.update(dataset.file_hash(data_path).encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    h.update(str(PIPELINE_VERSION).encode())
+    return h.hexdigest()[:16]
+
+
+def artifact_dir(key):
+    return os.path.join(ARTIFACT_ROOT, key)
+
+
+# =========================
+# TRAINING
+# =========================
+def evaluate_model(y_true, y_pred):
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    return {
+        "MAE": float(np.mean(np.abs(y_true - y_pred))),
+        "MSE": float(mean_squared_error(y_true, y_pred)),
+        "RMSE": math.sqrt(mean_squared_error(y_true, y_pred)),
+        "R²": float(r2_score(y_true, y_pred))
+    }
+
+
+def train(data_path=DATA_PATH, params=None):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.model_selection import train_test_split
+    from sklearn.linear_model import LinearRegression, Ridge, Lasso
+
+    import tuning
+    import vif
+
+    params = DEFAULT_PARAMS if params is None else params
+
+    # 1. Load data (presisi penuh, bukan frame float32 milik dashboard)
+    df = dataset.load_dataset(data_path, compact=False)
+    df = df.drop(columns="alcohol_level")
+    numeric_cols = df.select_dtypes(include="number").columns
+
+    # 2. Outlier (IQR)
+    Q1 = df[numeric_cols].quantile(0.25)
+    Q3 = df[numeric_cols].quantile(0.75)
+    IQR = Q3 - Q1
+    lower = Q1 - 1.5 * IQR
+    upper = Q3 + 1.5 * IQR
+
+    rows_before = df.shape[0]
+    df = df[~((df[numeric_cols] < lower) | (df[numeric_cols] > upper)).any(axis=1)]
+    rows_after = df.shape[0]
+
+    # 3. Korelasi & VIF
+    corr = df[numeric_cols].corr().round(2)
+    vif_df = pd.DataFrame({
+        "Feature": numeric_cols,
+        "VIF": vif.variance_inflation_factors(df[numeric_cols].to_numpy())
+    })
+
+    # 4. Standardisasi & split
+    X = df.drop(DROP_FEATURES, axis=1)
+    y = df["quality"]
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_scaled, y, test_size=params["test_size"], random_state=params["random_state"]
+    )
+
+    # 5. Linear Regression
+    lr = LinearRegression()
+    lr.fit(X_train, y_train)
+
+    # 6. Hyperparameter tuning
+    alphas = np.asarray(params["alphas"])
+
+    ridge_grid = tuning.tune_ridge(X_train, y_train, alphas, cv=params["cv"])
+    lasso_grid = tuning.tune_lasso(
+        X_train, y_train, alphas, cv=params["cv"], max_iter=params["lasso_max_iter"]
+    )
+
+    # 7. Final model
+    ridge_best = Ridge(alpha=ridge_grid.best_params_["alpha"])
+    lasso_best = Lasso(alpha=lasso_grid.best_params_["alpha"], max_iter=params["lasso_max_iter"])
+    ridge_best.fit(X_train, y_train)
+    lasso_best.fit(X_train, y_train)
+
+    feature_columns = X.columns.tolist()
+
+    # 8. Compiled scorer (scaler + ridge dilipat jadi satu dot product)
+    weights = scorer.compile_scorer(scaler, ridge_best)
+    scorer.verify(weights, scaler, ridge_best, X)
+
+    # 9. Bootstrap ensemble: B Ridge (alpha terbaik) pada resample data training.
+    # Dilewati untuk data training di atas bootstrap.MAX_ROWS (waktu O(B * n * p^2))
+    ensemble = None
+    bootstrap_metrics = None
+    if params.get("bootstrap_models") and len(X_train) <= bootstrap.MAX_ROWS:
+        ensemble = bootstrap.fit_ensemble(
+            X_train, y_train, ridge_best.alpha, scaler,
+            n_models=params["bootstrap_models"], random_state=params["random_state"]
+        )
+        bootstrap_metrics = {
+            "n_models": int(params["bootstrap_models"]),
+            "level": bootstrap.DEFAULT_LEVEL,
+            "test_coverage": bootstrap.coverage(
+                bootstrap.Ensemble(ensemble), scaler.inverse_transform(X_test), y_test
+            ),
+        }
+
+    return {
+        "models": {
+            "scaler": scaler,
+            "linear": lr,
+            "ridge": ridge_best,
+            "lasso": lasso_best,
+        },
+        "feature_columns": feature_columns,
+        "scorer": weights,
+        "ensemble": ensemble,
+        "tables": {
+            "preview": df.head(),
+            "corr": corr,
+            "vif": vif_df,
+            "coef_lr": pd.DataFrame({"Feature": feature_columns, "Coefficient": lr.coef_}),
+            "coef_compare": pd.DataFrame({
+                "Feature": feature_columns,
+                "Ridge Coef": ridge_best.coef_,
+                "Lasso Coef": lasso_best.coef_
+            }),
+        },
+        "cv_results": {
+            "ridge": pd.DataFrame(ridge_grid.cv_results_),
+            "lasso": pd.DataFrame(lasso_grid.cv_results_),
+        },
+        "metrics": {
+            "rows_before": int(rows_before),
+            "rows_after": int(rows_after),
+            # Batas IQR training, dipakai ulang oleh korelasi incremental di halaman ML
+            "iqr_bounds": {
+                "lower": {col: float(v) for col, v in lower.items()},
+                "upper": {col: float(v) for col, v in upper.items()},
+            },
+            "n_train": int(len(X_train)),
+            "n_test": int(len(X_test)),
+            "best_alpha_ridge": float(ridge_grid.best_params_["alpha"]),
+            "best_alpha_lasso": float(lasso_grid.best_params_["alpha"]),
+            "tuning_time_ridge": ridge_grid.wall_time,
+            "tuning_time_lasso": lasso_grid.wall_time,
+            "linear": evaluate_model(y_test, lr.predict(X_test)),
+            "ridge": evaluate_model(y_test, ridge_best.predict(X_test)),
+            "lasso": evaluate_model(y_test, lasso_best.predict(X_test)),
+            "bootstrap": bootstrap_metrics,
+        },
+    }
+
+
+def train_from_store(data_path=DATA_PATH, params=None):
+    # Varian train() untuk arsip besar: data bersih dibaca dari feature store
+    # memmap float32 (sudah di-scale, urutan baris [train..., test...]).
+    # Train/test adalah view dari file yang sama, tanpa DataFrame penuh;
+    # korelasi & VIF dihitung dari momen streaming saat store dibangun.
+    from sklearn.linear_model import LinearRegression, Ridge, Lasso
+
+    import feature_store
+    import tuning
+    import vif
+
+    params = DEFAULT_PARAMS if params is None else params
+    store = feature_store.load_store(
+        data_path, FEATURES, test_size=params["test_size"], random_state=params["random_state"]
+    )
+    X_train, y_train = store.train()
+    X_test, y_test = store.test()
+
+    numeric_cols = store.meta["numeric_columns"]
+    corr = store.correlation()
+    vif_df = pd.DataFrame({"Feature": numeric_cols, "VIF": vif.vif_from_gram(store.meta["numeric_m2"])})
+    corr = pd.DataFrame(corr, index=numeric_cols, columns=numeric_cols).round(2)
+
+    lr = LinearRegression()
+    lr.fit(X_train, y_train)
+
+    alphas = np.asarray(params["alphas"])
+    ridge_grid = tuning.tune_ridge(X_train, y_train, alphas, cv=params["cv"])
+    lasso_grid = tuning.tune_lasso(
+        X_train, y_train, alphas, cv=params["cv"], max_iter=params["lasso_max_iter"]
+    )
+
+    ridge_best = Ridge(alpha=ridge_grid.best_params_["alpha"])
+    lasso_best = Lasso(alpha=lasso_grid.best_params_["alpha"], max_iter=params["lasso_max_iter"])
+    ridge_best.fit(X_train, y_train)
+    lasso_best.fit(X_train, y_train)
+
+    scaler = store.scaler()
+    weights = scorer.compile_scorer(scaler, ridge_best)
+    scorer.verify(weights, scaler, ridge_best, store.unscale(X_test[:10_000]), atol=1e-6)
+
+    return {
+        "models": {
+            "scaler": scaler,
+            "linear": lr,
+            "ridge": ridge_best,
+            "lasso": lasso_best,
+        },
+        "feature_columns": list(FEATURES),
+        "scorer": weights,
+        # Bootstrap (B x n x p^2) tidak dijalankan untuk data skala feature store
+        "ensemble": None,
+        "tables": {
+            "preview": store.preview(),
+            "corr": corr,
+            "vif": vif_df,
+            "coef_lr": pd.DataFrame({"Feature": FEATURES, "Coefficient": lr.coef_}),
+            "coef_compare": pd.DataFrame({
+                "Feature": FEATURES,
+                "Ridge Coef": ridge_best.coef_,
+                "Lasso Coef": lasso_best.coef_
+            }),
+        },
+        "cv_results": {
+            "ridge": pd.DataFrame(ridge_grid.cv_results_),
+            "lasso": pd.DataFrame(lasso_grid.cv_results_),
+        },
+        "metrics": {
+            "rows_before": store.meta["rows_before"],
+            "rows_after": store.meta["rows"],
+            "iqr_bounds": {"lower": store.meta["lower"], "upper": store.meta["upper"]},
+            "n_train": int(len(X_train)),
+            "n_test": int(len(X_test)),
+            "best_alpha_ridge": float(ridge_grid.best_params_["alpha"]),
+            "best_alpha_lasso": float(lasso_grid.best_params_["alpha"]),
+            "tuning_time_ridge": ridge_grid.wall_time,
+            "tuning_time_lasso": lasso_grid.wall_time,
+            "linear": evaluate_model(y_test, lr.predict(X_test)),
+            "ridge": evaluate_model(y_test, ridge_best.predict(X_test)),
+            "lasso": evaluate_model(y_test, lasso_best.predict(X_test)),
+            "feature_store": store.path,
+        },
+    }
+
+
+# =========================
+# ARTIFACT STORE
+# =========================
+def save_artifacts(result, key, params, data_path=DATA_PATH):
+    os.makedirs(ARTIFACT_ROOT, exist_ok=True)
+    target = artifact_dir(key)
+
+    # Tulis ke folder sementara lalu rename, supaya pembaca
+    # tidak pernah melihat artifact yang setengah jadi.
+    tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=ARTIFACT_ROOT)
+    try:
+        for name, model in result["models"].items():
+            joblib.dump(model, os.path.join(tmp, MODEL_FILES[name]))
+        joblib.dump(result["feature_columns"], os.path.join(tmp, "feature_columns.joblib"))
+        scorer.save_scorer(result["scorer"], os.path.join(tmp, scorer.SCORER_FILE))
+        if result.get("ensemble") is not None:
+            bootstrap.save_ensemble(result["ensemble"], os.path.join(tmp, bootstrap.ENSEMBLE_FILE))
+        joblib.dump(result["tables"], os.path.join(tmp, "tables.joblib"))
+        joblib.dump(result["cv_results"], os.path.join(tmp, "cv_results.joblib"))
+
+        with open(os.path.join(tmp, "metrics.json"), "w") as f:
+            json.dump({
+                "key": key, "pipeline_version": PIPELINE_VERSION, "params": params,
+                "data_path": data_path, **result["metrics"],
+            }, f, indent=2)
+
+        os.rename(tmp, target)
+    except OSError:
+        # Proses lain sudah menulis key yang sama lebih dulu
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(target, "metrics.json")):
+            raise
+    return target
+
+
+def load_artifacts(key, with_models=True):
+    path = artifact_dir(key)
+    with open(os.path.join(path, "metrics.json")) as f:
+        metrics = json.load(f)
+
+    # Unpickle model = import sklearn (~1 detik); halaman yang hanya
+    # menampilkan tabel & metrik bisa melewatinya
+    models = {
+        name: joblib.load(os.path.join(path, filename))
+        for name, filename in MODEL_FILES.items()
+    } if with_models else {}
+
+    ensemble_path = os.path.join(path, bootstrap.ENSEMBLE_FILE)
+    return {
+        "models": models,
+        "feature_columns": joblib.load(os.path.join(path, "feature_columns.joblib")),
+        "scorer": scorer.load_scorer(os.path.join(path, scorer.SCORER_FILE)),
+        "ensemble": np.load(ensemble_path) if os.path.exists(ensemble_path) else None,
+        "tables": joblib.load(os.path.join(path, "tables.joblib")),
+        "cv_results": joblib.load(os.path.join(path, "cv_results.joblib")),
+        "metrics": metrics,
+    }
+
+
+# File yang wajib ada untuk load_artifacts (ensemble.npy opsional)
+REQUIRED_FILES = [
+    "metrics.json", "feature_columns.joblib", scorer.SCORER_FILE, "tables.joblib", "cv_results.joblib",
+    *MODEL_FILES.values(),
+]
+
+
+def has_artifacts(key):
+    path = artifact_dir(key)
+    return all(os.path.exists(os.path.join(path, name)) for name in REQUIRED_FILES)
+
+
+def _read_metrics(key):
+    with open(os.path.join(artifact_dir(key), "metrics.json")) as f:
+        return json.load(f)
+
+
+def _usable(key, data_path):
+    # Hanya artifact dari PIPELINE_VERSION yang sama (versi lama bisa tidak
+    # punya scorer.npy / metrik tuning) dan dari dataset/partisi yang sama
+    if key.startswith(".") or not has_artifacts(key):
+        return False
+    metrics = _read_metrics(key)
+    return (metrics.get("pipeline_version") == PIPELINE_VERSION
+            and os.path.abspath(metrics.get("data_path", DATA_PATH)) == os.path.abspath(data_path))
+
+
+def latest_key(data_path=DATA_PATH):
+    # Versi artifact terbaru yang lengkap untuk dataset/partisi ini (dipakai
+    # jika dataset berubah tetapi training ulang belum dijalankan)
+    if not os.path.isdir(ARTIFACT_ROOT):
+        return None
+    keys = [k for k in os.listdir(ARTIFACT_ROOT) if _usable(k, data_path)]
+    if not keys:
+        return None
+    return max(keys, key=lambda k: os.path.getmtime(os.path.join(artifact_dir(k), "metrics.json")))
+
+
+def load_or_train(data_path=DATA_PATH, params=None, force=False):
+    params = DEFAULT_PARAMS if params is None else params
+    key = pipeline_key(data_path, params)
+
+    # Folder tidak lengkap (mis. file terhapus manual) ditraining ulang juga
+    if (force or not has_artifacts(key)) and os.path.isdir(artifact_dir(key)):
+        shutil.rmtree(artifact_dir(key))
+    if not has_artifacts(key):
+        train_fn = train_from_store if params.get("feature_store") else train
+        save_artifacts(train_fn(data_path, params), key, params, data_path)
+
+    return load_artifacts(key)
+
+
+def _atomic_dump(obj, path):
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+
+
+def publish(result, key, base_dir="."):
+    # Artifact yang dipakai Prediction App (root untuk partisi default,
+    # models/<partisi>/ untuk partisi lain); manifest ditulis terakhir
+    # sebagai penanda bahwa set artifact versi `key` sudah lengkap
+    os.makedirs(base_dir, exist_ok=True)
+    files = {name: os.path.join(base_dir, filename) for name, filename in registry.ARTIFACT_FILES.items()}
+    _atomic_dump(result["models"]["scaler"], files["scaler"])
+    _atomic_dump(result["models"]["ridge"], files["model"])
+    _atomic_dump(result["feature_columns"], files["feature_columns"])
+    scorer.save_scorer(result["scorer"], files["scorer"])
+
+    # Ensemble lama tidak boleh tertinggal bersama scorer versi baru
+    ensemble_path = os.path.join(base_dir, bootstrap.ENSEMBLE_FILE)
+    if result.get("ensemble") is not None:
+        bootstrap.save_ensemble(result["ensemble"], ensemble_path)
+    elif os.path.exists(ensemble_path):
+        os.remove(ensemble_path)
+    registry.write_manifest(key, base_dir)
@@ -1,9 +1,17 @@
+import tempfile
+
 import streamlit as st
-import pandas as pd
-import joblib
+
+import bootstrap
+import partitions
+import scorer
+from instrumentation import stage
+from prediction_cache import INPUT_DECIMALS, get_prediction_cache
+from registry import get_registry
 
 
-def prediction_app():
+def prediction_app(partition=None):
+    partition = partition or partitions.default_partition()
 
     # =========================
     # 🎨 RED WINE THEME
@@ -52,91 +60,198 @@ def prediction_app():
     )
 
     # =========================
-    # INPUT FEATURES
+    # INPUT FEATURES + HASIL (fragment: submit hanya me-rerun bagian ini)
     # =========================
+    # Registry + artifact partisi dimuat saat pertama dipakai, sekali per proses
+    if not get_registry(partition.model_dir).has_artifacts():
+        st.warning(
+            f"Belum ada model untuk dataset **{partition.label}**. "
+            f"Jalankan `python train.py{partition.cli_option}` terlebih dahulu."
+        )
+        return
+
     st.subheader("🧪 Input Fitur Wine")
+    prediction_form(partition)
 
-    col1, col2 = st.columns(2)
+    # =========================
+    # BATCH PREDICTION (CSV)
+    # =========================
+    st.subheader("📂 Batch Prediction (CSV)")
+    st.write(
+        "Upload file CSV dengan kolom yang sama seperti **Wine Quality Dataset.csv** "
+        "untuk memprediksi banyak sampel sekaligus."
+    )
+    batch_prediction(partition)
 
-    with col1:
-        fixed_acidity = st.number_input("Fixed Acidity", 0.0, 20.0, 7.4)
-        volatile_acidity = st.number_input("Volatile Acidity", 0.0, 5.0, 0.7)
-        citric_acid = st.number_input("Citric Acid", 0.0, 5.0, 0.0)
-        residual_sugar = st.number_input("Residual Sugar", 0.0, 20.0, 1.9)
-        chlorides = st.number_input("Chlorides", 0.0, 1.0, 0.076)
 
-    with col2:
-        free_sulfur_dioxide = st.number_input("Free Sulfur Dioxide", 0.0, 100.0, 11.0)
-        total_sulfur_dioxide = st.number_input("Total Sulfur Dioxide", 0.0, 300.0, 34.0)
-        sulphates = st.number_input("Sulphates", 0.0, 2.0, 0.56)
-        alcohol = st.number_input("Alcohol (%)", 5.0, 20.0, 9.4)
+# Presisi widget per fitur (INPUT_DECIMALS)
+def feature_input(label, feature, min_value, max_value, value):
+    decimals = INPUT_DECIMALS[feature]
+    return st.number_input(
+        label, min_value, max_value, value, step=10 ** -decimals, format=f"%.{decimals}f"
+    )
 
-    # =========================
-    # PREDICT BUTTON
-    # =========================
-    if st.button("🍷 Predict Wine Quality"):
 
-        input_data = pd.DataFrame({
-            "fixed acidity": [fixed_acidity],
-            "volatile acidity": [volatile_acidity],
-            "citric acid": [citric_acid],
-            "residual sugar": [residual_sugar],
-            "chlorides": [chlorides],
-            "free sulfur dioxide": [free_sulfur_dioxide],
-            "total sulfur dioxide": [total_sulfur_dioxide],
-            "sulphates": [sulphates],
-            "alcohol": [alcohol]
-        })
+# Input dibungkus st.form: mengubah angka tidak memicu rerun sama sekali,
+# dan submit hanya me-rerun fragment ini (bukan CSS, hero, atau halaman lain)
+@st.fragment
+def prediction_form(partition):
+    with st.form("prediction_form", border=False):
+        col1, col2 = st.columns(2)
 
-        # =========================
-        # LOAD MODEL
-        # =========================
-        feature_columns = joblib.load("feature_columns.joblib")
-        scaler = joblib.load("scaler.joblib")
-        model = joblib.load("ridge_model.joblib")
+        with col1:
+            fixed_acidity = feature_input("Fixed Acidity", "fixed acidity", 0.0, 20.0, 7.4)
+            volatile_acidity = feature_input("Volatile Acidity", "volatile acidity", 0.0, 5.0, 0.7)
+            citric_acid = feature_input("Citric Acid", "citric acid", 0.0, 5.0, 0.0)
+            residual_sugar = feature_input("Residual Sugar", "residual sugar", 0.0, 20.0, 1.9)
+            chlorides = feature_input("Chlorides", "chlorides", 0.0, 1.0, 0.076)
 
-        input_data = input_data[feature_columns]
-        input_scaled = scaler.transform(input_data)
+        with col2:
+            free_sulfur_dioxide = feature_input("Free Sulfur Dioxide", "free sulfur dioxide", 0.0, 100.0, 11.0)
+            total_sulfur_dioxide = feature_input("Total Sulfur Dioxide", "total sulfur dioxide", 0.0, 300.0, 34.0)
+            sulphates = feature_input("Sulphates", "sulphates", 0.0, 2.0, 0.56)
+            alcohol = feature_input("Alcohol (%)", "alcohol", 5.0, 20.0, 9.4)
 
         # =========================
-        # PREDICTION
+        # PREDICT BUTTON
         # =========================
-        score = float(model.predict(input_scaled)[0])
-        rounded_score = int(round(score))
+        submitted = st.form_submit_button("🍷 Predict Wine Quality")
 
-        quality_mapping = {
-            3: "Low",
-            4: "Below Average",
-            5: "Average",
-            6: "Good",
-            7: "Very Good",
-            8: "Excellent"
-        }
+    if not submitted:
+        return
 
-        quality_label = quality_mapping.get(rounded_score, "Unknown")
+    input_data = {
+        "fixed acidity": fixed_acidity,
+        "volatile acidity": volatile_acidity,
+        "citric acid": citric_acid,
+        "residual sugar": residual_sugar,
+        "chlorides": chlorides,
+        "free sulfur dioxide": free_sulfur_dioxide,
+        "total sulfur dioxide": total_sulfur_dioxide,
+        "sulphates": sulphates,
+        "alcohol": alcohol
+    }
 
-        # =========================
-        # RESULT CARD
-        # =========================
-        st.markdown(f"""
-        <div class="result-card">
-            <div style="font-size:18px;">Predicted Wine Quality</div>
-            <div class="result-score">{quality_label}</div>
-            <div style="margin-top:8px;">Predicted Score: <b>{score:.2f}</b></div>
-        </div>
-        """, unsafe_allow_html=True)
-
-        st.markdown(f"""
-        <div class="card">
-            <div class="card-title">📌 Interpretasi Hasil</div>
-            <ul>
-                <li>Model memprediksi kualitas wine pada skor <b>{score:.2f}</b>.</li>
-                <li>Nilai ini paling dekat dengan kualitas <b>{rounded_score}</b>.</li>
-                <li>Berdasarkan pemetaan kualitas, wine ini tergolong <b>{quality_label}</b>.</li>
-                <li>Prediksi dihasilkan menggunakan <b>Ridge Regression</b> untuk menjaga stabilitas model.</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+    # =========================
+    # LOAD MODEL (shared registry, dimuat sekali per proses)
+    # =========================
+    # Satu snapshot dipakai untuk seluruh request agar feature_columns,
+    # scaler, dan model selalu berasal dari versi yang sama
+    with stage("predict.load_model"):
+        model = get_registry(partition.model_dir).get()
+
+    input_vector = [input_data[col] for col in model.feature_columns]
+
+    # =========================
+    # PREDICTION (cache LRU per versi model -> compiled scorer)
+    # =========================
+    cache = get_prediction_cache(partition.model_dir)
+    with stage("predict.score"):
+        score = cache.predict(model, input_vector)
+
+    # =========================
+    # UNCERTAINTY (bootstrap ensemble: satu matvec B x p)
+    # =========================
+    uncertainty = None
+    if model.ensemble is not None:
+        with stage("predict.interval"):
+            uncertainty = bootstrap.predict_interval(model.ensemble, input_vector)
+
+    result_card(score, model.version, cache.stats()["hit_rate"], uncertainty)
+
+
+def result_card(score, model_version, hit_rate, uncertainty=None):
+    rounded_score = int(round(score))
+    quality_label = scorer.QUALITY_MAPPING.get(rounded_score, "Unknown")
+
+    # =========================
+    # RESULT CARD
+    # =========================
+    st.markdown(f"""
+    <div class="result-card">
+        <div style="font-size:18px;">Predicted Wine Quality</div>
+        <div class="result-score">{quality_label}</div>
+        <div style="margin-top:8px;">Predicted Score: <b>{score:.2f}</b></div>
+        <div style="margin-top:4px; font-size:12px; opacity:0.85;">Model version: {model_version}</div>
+        <div style="font-size:12px; opacity:0.85;">Cache hit rate: {hit_rate:.0%}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown(f"""
+    <div class="card">
+        <div class="card-title">📌 Interpretasi Hasil</div>
+        <ul>
+            <li>Model memprediksi kualitas wine pada skor <b>{score:.2f}</b>.</li>
+            <li>Nilai ini paling dekat dengan kualitas <b>{rounded_score}</b>.</li>
+            <li>Berdasarkan pemetaan kualitas, wine ini tergolong <b>{quality_label}</b>.</li>
+            <li>Prediksi dihasilkan menggunakan <b>Ridge Regression</b> untuk menjaga stabilitas model.</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if uncertainty is None:
+        return
+
+    # =========================
+    # INTERVAL & PELUANG LABEL
+    # =========================
+    low, high = uncertainty["interval"]
+    mean_low, mean_high = uncertainty["mean_interval"]
+    bars = "".join(
+        f"""
+        <div style="display:flex; align-items:center; margin:4px 0;">
+            <div style="width:120px;">{label}</div>
+            <div style="flex:1; background:#EEDADF; border-radius:6px; height:14px;">
+                <div style="width:{prob:.1%}; background:#A63A50; border-radius:6px; height:14px;"></div>
+            </div>
+            <div style="width:60px; text-align:right;">{prob:.1%}</div>
+        </div>"""
+        for label, prob in uncertainty["label_probabilities"].items()
+        if prob > 0 or label != "Unknown"
+    )
+    st.markdown(f"""
+    <div class="card">
+        <div class="card-title">🎯 Ketidakpastian Prediksi</div>
+        <ul>
+            <li>Rentang skor {uncertainty['level']:.0%}: <b>{low:.2f} – {high:.2f}</b>
+                (rata-rata model: {mean_low:.2f} – {mean_high:.2f}).</li>
+            <li>Dihitung dari <b>{uncertainty['n_models']}</b> model Ridge bootstrap.</li>
+        </ul>
+        {bars}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# Upload / klik tombol batch hanya me-rerun fragment ini
+@st.fragment
+def batch_prediction(partition):
+    uploaded = st.file_uploader("Upload CSV", type="csv")
+
+    if uploaded is not None and st.button("🍷 Predict Batch"):
+        # batch_predict memakai pandas; di-import hanya saat batch dijalankan
+        from batch_predict import score_csv
+
+        with tempfile.NamedTemporaryFile(mode="w+", suffix=".csv", newline="") as output:
+            try:
+                with stage("predict.batch"):
+                    stats = score_csv(uploaded, output, model_dir=partition.model_dir)
+            except ValueError as e:
+                st.error(str(e))
+                return
+
+            output.seek(0)
+            st.success(
+                f"{stats['rows']} baris diprediksi dalam {stats['seconds']:.2f} detik "
+                f"({stats['rows_per_sec']:,.0f} rows/sec) — model version {stats['model_version']}"
+            )
+            # Download tidak perlu rerun apa pun
+            st.download_button(
+                "⬇️ Download Hasil Prediksi",
+                data=output.read(),
+                file_name="wine_quality_predictions.csv",
+                mime="text/csv",
+                on_click="ignore"
+            )
 
 
 # =========================
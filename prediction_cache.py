@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+
+import scorer
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_MAXSIZE = 4096
+
+# Presisi (jumlah desimal) input widget di Prediction App. Key cache tidak
+# dikuantisasi (lihat PredictionCache.key); input widget sudah berpresisi
+# ini sehingga nilai yang sama menghasilkan key yang sama.
+INPUT_DECIMALS = {
+    "fixed acidity": 1,
+    "volatile acidity": 3,
+    "citric acid": 2,
+    "residual sugar": 2,
+    "chlorides": 3,
+    "free sulfur dioxide": 1,
+    "total sulfur dioxide": 1,
+    "sulphates": 2,
+    "alcohol": 2,
+}
+
+
+# =========================
+# LRU CACHE (per versi model)
+# =========================
+class PredictionCache:
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(vector):
+        # Key = vektor mentah (float persis). Skor selalu dihitung dari vektor
+        # ini, jadi hasil dengan cache sama persis dengan tanpa cache, baik
+        # dari Prediction App maupun service HTTP.
+        return tuple(map(float, vector))
+
+    def _check_version(self, version):
+        # Artifact berganti -> semua hasil lama tidak berlaku lagi
+        if version != self._version:
+            if self._items:
+                self.invalidations += 1
+            self._items.clear()
+            self._version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            score = self._items.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key, version, score):
+        with self._lock:
+            self._check_version(version)
+            self._items[key] = score
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def predict(self, snapshot, vector):
+        # vector berurutan sesuai snapshot.feature_columns
+        key = self.key(vector)
+        score = self.get(key, snapshot.version)
+        if score is None:
+            score = float(scorer.score(snapshot.scorer, key))
+            self.put(key, snapshot.version, score)
+        return score
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+            "invalidations": self.invalidations,
+            "model_version": self._version,
+        }
+
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache(scope="."):
+    # Satu cache per registry (folder artifact partisi) per proses, supaya
+    # berpindah partisi tidak saling meng-invalidate; dipakai semua session
+    cache = _caches.get(scope)
+    if cache is None:
+        with _cache_lock:
+            cache = _caches.get(scope)
+            if cache is None:
+                cache = _caches[scope] = PredictionCache()
+    return cache
@@ -0,0 +1,198 @@
+import functools
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import joblib
+
+import bootstrap
+import scorer
+
+
+# =========================
+# CONFIG
+# =========================
+ARTIFACT_FILES = {
+    "feature_columns": "feature_columns.joblib",
+    "scaler": "scaler.joblib",
+    "model": "ridge_model.joblib",
+    "scorer": scorer.SCORER_FILE,
+}
+# Artifact opsional: ikut di-hash dan dimuat hanya jika ada
+OPTIONAL_FILES = {
+    "ensemble": bootstrap.ENSEMBLE_FILE,
+}
+MANIFEST_FILE = "model_manifest.json"
+
+# Seberapa sering (detik) registry mengecek perubahan artifact di disk
+CHECK_INTERVAL = 1.0
+
+
+class ModelSnapshot:
+    # Prediksi hanya butuh feature_columns + scorer (NumPy). Scaler dan model
+    # sklearn disimpan sebagai bytes mentah dan baru di-unpickle saat diakses,
+    # sehingga halaman prediksi tidak pernah meng-import sklearn. Bytes dibaca
+    # bersamaan dengan file lain, jadi tetap konsisten dengan `version`.
+
+    def __init__(self, version, feature_columns, scorer, loaded_at, scaler_bytes, model_bytes, ensemble=None):
+        self.version = version
+        self.feature_columns = feature_columns
+        self.scorer = scorer
+        # bootstrap.Ensemble (B model Ridge) untuk interval prediksi, atau None
+        self.ensemble = ensemble
+        self.loaded_at = loaded_at
+        self._scaler_bytes = scaler_bytes
+        self._model_bytes = model_bytes
+
+    @functools.cached_property
+    def scaler(self):
+        return joblib.load(io.BytesIO(self._scaler_bytes))
+
+    @functools.cached_property
+    def model(self):
+        return joblib.load(io.BytesIO(self._model_bytes))
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _artifact_files(base_dir):
+    # Artifact wajib + artifact opsional yang ada di folder ini
+    files = dict(ARTIFACT_FILES)
+    files.update({
+        name: filename for name, filename in OPTIONAL_FILES.items()
+        if os.path.exists(os.path.join(base_dir, filename))
+    })
+    return files
+
+
+def write_manifest(version, base_dir="."):
+    # Ditulis paling akhir oleh publisher: isinya hash setiap artifact,
+    # sehingga reader bisa tahu apakah set artifact sudah lengkap
+    manifest = {
+        "version": version,
+        "files": {
+            name: _sha256(os.path.join(base_dir, filename))
+            for name, filename in _artifact_files(base_dir).items()
+        },
+    }
+    path = os.path.join(base_dir, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+
+    def __init__(self, base_dir=".", check_interval=CHECK_INTERVAL):
+        self.base_dir = base_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._fingerprint = None
+        self._last_check = 0.0
+        self.reloads = 0
+
+    def _path(self, filename):
+        return os.path.join(self.base_dir, filename)
+
+    def has_artifacts(self):
+        return all(os.path.exists(self._path(filename)) for filename in ARTIFACT_FILES.values())
+
+    def _current_fingerprint(self):
+        files = list(ARTIFACT_FILES.values()) + list(OPTIONAL_FILES.values()) + [MANIFEST_FILE]
+        fingerprint = []
+        for filename in files:
+            try:
+                stat = os.stat(self._path(filename))
+                fingerprint.append((filename, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                fingerprint.append((filename, None, None))
+        return tuple(fingerprint)
+
+    def _load(self):
+        files = _artifact_files(self.base_dir)
+        hashes = {
+            name: _sha256(self._path(filename))
+            for name, filename in files.items()
+        }
+
+        manifest_path = self._path(MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest["files"] != hashes:
+                # Publisher sedang menulis; tetap pakai snapshot lama
+                return None
+            version = manifest["version"]
+        else:
+            combined = "".join(hashes[name] for name in files)
+            version = hashlib.sha256(combined.encode()).hexdigest()[:16]
+
+        return ModelSnapshot(
+            version=version,
+            feature_columns=joblib.load(self._path(ARTIFACT_FILES["feature_columns"])),
+            scorer=scorer.load_scorer(self._path(ARTIFACT_FILES["scorer"])),
+            loaded_at=time.time(),
+            scaler_bytes=_read_bytes(self._path(ARTIFACT_FILES["scaler"])),
+            model_bytes=_read_bytes(self._path(ARTIFACT_FILES["model"])),
+            ensemble=bootstrap.load_ensemble(self._path(files["ensemble"])) if "ensemble" in files else None,
+        )
+
+    def get(self):
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._last_check < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is not None and now - self._last_check < self.check_interval:
+                return self._snapshot
+            self._last_check = now
+
+            fingerprint = self._current_fingerprint()
+            if fingerprint != self._fingerprint:
+                snapshot = self._load()
+                # Reload dianggap valid hanya jika file tidak berubah selama dibaca
+                if snapshot is not None and fingerprint == self._current_fingerprint():
+                    self._snapshot = snapshot
+                    self._fingerprint = fingerprint
+                    self.reloads += 1
+                elif self._snapshot is None:
+                    raise RuntimeError("Model artifacts sedang ditulis, coba lagi.")
+
+            return self._snapshot
+
+    def predict(self, X):
+        # X: vektor (p,) atau matriks (N, p) dengan urutan kolom feature_columns
+        snapshot = self.get()
+        return scorer.score(snapshot.scorer, X), snapshot.version
+
+
+_registries = {}
+_registry_lock = threading.Lock()
+
+
+def get_registry(base_dir="."):
+    # Satu registry per folder artifact (per partisi) per proses, dipakai
+    # bersama oleh semua session Streamlit; dibuat saat pertama diminta
+    registry = _registries.get(base_dir)
+    if registry is None:
+        with _registry_lock:
+            registry = _registries.get(base_dir)
+            if registry is None:
+                registry = _registries[base_dir] = ModelRegistry(base_dir)
+    return registry
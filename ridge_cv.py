@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from sklearn.model_selection import KFold
+
+
+# =========================
+# CLOSED-FORM RIDGE
+# =========================
+# Untuk X yang sudah di-center dengan SVD X = U S V^T:
+#   coef(alpha) = V diag(s / (s^2 + alpha)) U^T y
+# Satu SVD cukup untuk seluruh grid alpha; setiap alpha tambahan hanya
+# berupa perkalian matriks kecil (p x p), bukan fit ulang.
+
+
+def _svd_centered(X, y):
+    x_mean, y_mean = X.mean(axis=0), y.mean()
+    U, s, Vt = np.linalg.svd(X - x_mean, full_matrices=False)
+    return x_mean, y_mean, U, s, Vt
+
+
+def ridge_path(X, y, alphas):
+    # Koefisien (n_alphas, p) dan intercept (n_alphas,) untuk semua alpha
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    alphas = np.asarray(alphas, dtype=np.float64)
+
+    x_mean, y_mean, U, s, Vt = _svd_centered(X, y)
+    d = s[None, :] / (s[None, :] ** 2 + alphas[:, None])
+    coefs = (d * (U.T @ (y - y_mean))[None, :]) @ Vt
+    intercepts = y_mean - coefs @ x_mean
+    return coefs, intercepts
+
+
+def _fold_mse(X, y, train_idx, val_idx, alphas):
+    start = time.perf_counter()
+    coefs, intercepts = ridge_path(X[train_idx], y[train_idx], alphas)
+    pred = X[val_idx] @ coefs.T + intercepts
+    mse = ((pred - y[val_idx][:, None]) ** 2).mean(axis=0)
+    return mse, time.perf_counter() - start
+
+
+# =========================
+# K-FOLD CV (setara GridSearchCV(Ridge(), cv=k))
+# =========================
+def kfold_mse(X, y, alphas, cv=10, n_jobs=-1):
+    # Return: mse per fold (n_folds, n_alphas) dan waktu per fold.
+    # Fold dibuat dengan KFold tanpa shuffle, sama seperti GridSearchCV(cv=int).
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    alphas = np.asarray(alphas, dtype=np.float64)
+
+    out = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_fold_mse)(X, y, tr, va, alphas)
+        for tr, va in KFold(n_splits=cv).split(X)
+    )
+    return np.array([o[0] for o in out]), [o[1] for o in out]
+
+
+# =========================
+# LEAVE-ONE-OUT / GCV (satu SVD untuk seluruh data)
+# =========================
+LOO_MODES = ("loo", "gcv")
+
+
+def loo_mse(X, y, alphas, mode="loo"):
+    # Hat matrix ridge dengan intercept tanpa penalti:
+    #   H = 11^T / n + U diag(s^2 / (s^2 + alpha)) U^T
+    # LOO  : mean((e_i / (1 - h_ii))^2)   (eksak, tanpa n kali fit)
+    # GCV  : mean(e_i^2) / (1 - tr(H) / n)^2
+    if mode not in LOO_MODES:
+        raise ValueError(f"mode tidak dikenal: {mode!r} (pilihan: {', '.join(LOO_MODES)})")
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    alphas = np.asarray(alphas, dtype=np.float64)
+    n = len(y)
+
+    _, y_mean, U, s, _ = _svd_centered(X, y)
+    shrink = s[None, :] ** 2 / (s[None, :] ** 2 + alphas[:, None])   # (n_alphas, k)
+    Uty = U.T @ (y - y_mean)
+
+    fitted = y_mean + (shrink * Uty[None, :]) @ U.T                  # (n_alphas, n)
+    residuals = y[None, :] - fitted
+
+    if mode == "gcv":
+        trace = 1 + shrink.sum(axis=1)
+        return (residuals ** 2).mean(axis=1) / (1 - trace / n) ** 2
+
+    h_diag = 1 / n + shrink @ (U ** 2).T                              # (n_alphas, n)
+    return ((residuals / (1 - h_diag)) ** 2).mean(axis=1)
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import numpy as np
+
+
+# =========================
+# COMPILED LINEAR SCORER
+# =========================
+# StandardScaler + Ridge = satu dot product:
+#   y = sum(coef * (x - mean) / scale) + intercept
+#     = x @ (coef / scale) + (intercept - sum(coef * mean / scale))
+# Artifact disimpan sebagai satu array float64 contiguous: [w_1, ..., w_p, b]
+
+SCORER_FILE = "scorer.npy"
+
+QUALITY_MAPPING = {
+    3: "Low",
+    4: "Below Average",
+    5: "Average",
+    6: "Good",
+    7: "Very Good",
+    8: "Excellent"
+}
+
+
+def compile_scorer(scaler, model):
+    coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros_like(coef)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(coef)
+
+    weights = coef / scale
+    bias = float(model.intercept_) - float(np.dot(weights, mean))
+    return np.ascontiguousarray(np.append(weights, bias), dtype=np.float64)
+
+
+def save_scorer(weights, path=SCORER_FILE):
+    tmp = path + ".tmp.npy"
+    np.save(tmp, weights)
+    os.replace(tmp, path)
+
+
+def load_scorer(path=SCORER_FILE):
+    return np.ascontiguousarray(np.load(path), dtype=np.float64)
+
+
+def score(weights, X):
+    # X: vektor fitur mentah (p,) atau matriks (N, p) dengan urutan feature_columns
+    X = np.asarray(X, dtype=np.float64)
+    return X @ weights[:-1] + weights[-1]
+
+
+def verify(weights, scaler, model, X, atol=1e-9):
+    # Bandingkan dengan jalur lama scaler.transform + model.predict
+    expected = model.predict(scaler.transform(X))
+    max_error = float(np.max(np.abs(score(weights, X) - expected)))
+    if max_error > atol:
+        raise AssertionError(f"Compiled scorer berbeda dari scaler + ridge (max error {max_error:.3e})")
+    return max_error
+
+
+# =========================
+# CLI: python scorer.py [dataset.csv]
+# =========================
+if __name__ == "__main__":
+    import joblib
+    import pandas as pd
+
+    import registry
+
+    data_path = sys.argv[1] if len(sys.argv) > 1 else "Wine Quality Dataset.csv"
+
+    # Artifact hasil pipeline.publish dilindungi manifest (hash tiap file);
+    # menulis ulang scorer.npy di sini membuat registry menolak set artifact
+    # itu selamanya ("sedang ditulis"). Kompilasi ulang lewat train.py.
+    if os.path.exists(registry.MANIFEST_FILE):
+        sys.exit(
+            f"{registry.MANIFEST_FILE} ada: {SCORER_FILE} dikelola oleh publisher. "
+            "Jalankan `python train.py` untuk mengompilasi ulang dan mem-publish artifact."
+        )
+
+    feature_columns = joblib.load("feature_columns.joblib")
+    scaler = joblib.load("scaler.joblib")
+    model = joblib.load("ridge_model.joblib")
+
+    weights = compile_scorer(scaler, model)
+    X = pd.read_csv(data_path)[feature_columns]
+    max_error = verify(weights, scaler, model, X)
+
+    save_scorer(weights)
+    print(f"{SCORER_FILE} ditulis ({len(X)} baris diverifikasi, max error {max_error:.3e})")
@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+import scorer
+from prediction_cache import PredictionCache, get_prediction_cache
+from registry import get_registry
+
+
+# =========================
+# CONFIG
+# =========================
+DEFAULT_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 256
+LATENCY_WINDOW = 10_000
+
+logger = logging.getLogger("wine.service")
+
+
+# =========================
+# MICRO-BATCHER
+# =========================
+class MicroBatcher:
+    # Request tunggal yang datang bersamaan dikumpulkan selama `window_ms`
+    # (atau sampai `max_batch`) lalu diskor sekaligus dengan satu matmul
+
+    def __init__(self, registry=None, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH, cache=True):
+        self.registry = registry or get_registry()
+        # Request berulang dijawab dari cache LRU tanpa masuk antrean batch
+        self.cache = get_prediction_cache() if cache is True else (cache or None)
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = None
+        self._worker = None
+
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.batched = 0
+        self.batches = 0
+        self.started_at = time.perf_counter()
+
+    def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def feature_columns(self):
+        return self.registry.get().feature_columns
+
+    def to_vector(self, features):
+        # Terima dict {nama_fitur: nilai} atau list sesuai urutan feature_columns
+        columns = self.feature_columns()
+        if isinstance(features, dict):
+            missing = [col for col in columns if col not in features]
+            if missing:
+                raise ValueError(f"Fitur tidak lengkap: {', '.join(missing)}")
+            return [float(features[col]) for col in columns]
+        if len(features) != len(columns):
+            raise ValueError(f"Butuh {len(columns)} fitur, diterima {len(features)}")
+        return [float(v) for v in features]
+
+    async def predict(self, features):
+        self.start()
+        vector = self.to_vector(features)
+        start = time.perf_counter()
+        self.requests += 1
+
+        # Key cache = vektor mentah (sama dengan Prediction App), jadi skor
+        # dengan cache sama persis dengan --no-cache
+        key = PredictionCache.key(vector)
+        if self.cache is not None:
+            snapshot = self.registry.get()
+            score = self.cache.get(key, snapshot.version)
+            if score is not None:
+                self.latencies.append(time.perf_counter() - start)
+                return score, snapshot.version
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((vector, future))
+        score, version = await future
+        if self.cache is not None:
+            self.cache.put(key, version, score)
+        self.latencies.append(time.perf_counter() - start)
+        return score, version
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Error saat scoring (registry gagal load, jumlah fitur berubah
+            # setelah hot reload, ...) diteruskan ke semua request di batch ini;
+            # worker tetap berjalan untuk batch berikutnya
+            try:
+                model = self.registry.get()
+                scores = scorer.score(model.scorer, np.array([v for v, _ in batch]))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), score in zip(batch, scores):
+                if not future.done():
+                    future.set_result((float(score), model.version))
+
+            self.batched += len(batch)
+            self.batches += 1
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1000
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched": self.batched,
+            "mean_batch_size": self.batched / self.batches if self.batches else 0.0,
+            "qps": self.requests / elapsed if elapsed > 0 else 0.0,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+# =========================
+# APP (dipakai oleh server HTTP dan client in-process)
+# =========================
+class ScoringApp:
+
+    def __init__(self, batcher=None):
+        self.batcher = batcher or MicroBatcher()
+
+    async def handle(self, method, path, body=b""):
+        # Return (status, dict)
+        try:
+            if method == "GET" and path == "/health":
+                return 200, {"status": "ok", "model_version": self.batcher.registry.get().version}
+
+            if method == "GET" and path == "/metrics":
+                return 200, self.batcher.stats()
+
+            if method == "POST" and path == "/predict":
+                payload = json.loads(body or b"{}")
+                score, version = await self.batcher.predict(payload.get("features", {}))
+                rounded = int(round(score))
+                return 200, {
+                    "score": score,
+                    "quality": rounded,
+                    "label": scorer.QUALITY_MAPPING.get(rounded, "Unknown"),
+                    "model_version": version,
+                }
+
+            return 404, {"error": "not found"}
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            logger.exception("Request %s %s gagal", method, path)
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+
+class InProcessClient:
+    # Untuk pengujian lokal: memanggil ScoringApp langsung tanpa socket
+
+    def __init__(self, app=None):
+        self.app = app or ScoringApp()
+
+    async def predict(self, features):
+        return await self.app.handle("POST", "/predict", json.dumps({"features": features}).encode())
+
+    async def metrics(self):
+        return await self.app.handle("GET", "/metrics")
+
+
+# =========================
+# HTTP SERVER (asyncio, HTTP/1.1 keep-alive)
+# =========================
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+async def _serve_connection(app, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode().split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, payload = await app.handle(method, path, body)
+
+            data = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8000, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH, cache=True):
+    app = ScoringApp(MicroBatcher(window_ms=window_ms, max_batch=max_batch, cache=cache))
+    server = await asyncio.start_server(
+        lambda r, w: _serve_connection(app, r, w), host, port
+    )
+    print(f"Scoring service di http://{host}:{port} (window {window_ms} ms, batch maks {max_batch})")
+    async with server:
+        await server.serve_forever()
+
+
+# =========================
+# LOAD TEST IN-PROCESS
+# =========================
+async def bench(n_requests=20_000, concurrency=256, window_ms=DEFAULT_WINDOW_MS, cache=True):
+    client = InProcessClient(ScoringApp(MicroBatcher(window_ms=window_ms, cache=cache)))
+    sample = [7.4, 0.7, 0.0, 1.9, 0.076, 11.0, 34.0, 0.56, 9.4]
+
+    async def worker(count):
+        for _ in range(count):
+            await client.predict(sample)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n_requests // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    _, stats = await client.metrics()
+    stats["qps"] = stats["requests"] / elapsed
+    await client.app.batcher.stop()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP scoring service dengan micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--bench", action="store_true", help="jalankan load test in-process lalu keluar")
+    parser.add_argument("--no-cache", action="store_true", help="matikan cache prediksi")
+    args = parser.parse_args()
+
+    if args.bench:
+        print(json.dumps(asyncio.run(bench(window_ms=args.window_ms, cache=not args.no_cache)), indent=2))
+    else:
+        asyncio.run(serve(args.host, args.port, args.window_ms, args.max_batch, cache=not args.no_cache))
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import time
+
+import dataset
+import partitions
+import pipeline
+
+
+# =========================
+# HEADLESS TRAINING
+# =========================
+# python train.py                  -> training (jika perlu) + publish artifact produksi
+# python train.py --force          -> training ulang walau key sudah ada
+# python train.py --no-publish     -> hanya simpan di artifacts/<key>/
+# python train.py --feature-store  -> training dari feature store memmap float32
+#                                     (untuk arsip multi-juta baris)
+# python train.py --partition source=kebun_a/varietal=red/vintage=2019
+#                                  -> training partisi, publish ke models/<partisi>/
+#
+# Aman dijalankan terjadwal di batch node: semua artifact ditulis atomik
+# (tmp + rename) dan Prediction App memuat ulang lewat manifest.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training pipeline Wine Quality (tanpa Streamlit)")
+    parser.add_argument("--data", help="path CSV (default: CSV milik partisi)")
+    parser.add_argument("--partition", default=partitions.DEFAULT_ID,
+                        help="id partisi, lihat `python partitions.py list`")
+    parser.add_argument("--report", default="training_report.json", help="path laporan metrik JSON")
+    parser.add_argument("--force", action="store_true", help="training ulang walau artifact sudah ada")
+    parser.add_argument("--no-publish", action="store_true", help="jangan timpa artifact produksi")
+    parser.add_argument("--feature-store", action="store_true",
+                        help="baca data bersih dari feature store memmap (hemat memori)")
+    args = parser.parse_args()
+
+    partition = partitions.get_partition(args.partition)
+    data_path = args.data or partition.data_path
+
+    params = dict(pipeline.DEFAULT_PARAMS)
+    if args.feature_store:
+        params["feature_store"] = True
+
+    start = time.perf_counter()
+    key = pipeline.pipeline_key(data_path, params)
+    cached = pipeline.has_artifacts(key) and not args.force
+
+    result = pipeline.load_or_train(data_path, params, force=args.force)
+    train_seconds = time.perf_counter() - start
+
+    if not args.no_publish:
+        pipeline.publish(result, key, partition.model_dir)
+
+    report = {
+        "key": key,
+        "partition": partition.id,
+        "data_path": data_path,
+        "data_version": dataset.dataset_version(data_path),
+        "artifact_dir": pipeline.artifact_dir(key),
+        "cached": cached,
+        "published": not args.no_publish,
+        "train_seconds": train_seconds,
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metrics": result["metrics"],
+    }
+
+    tmp = args.report + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, args.report)
+
+    ridge = result["metrics"]["ridge"]
+    print(
+        f"[{key}] {'cache' if cached else 'trained'} dalam {train_seconds:.2f} s — "
+        f"Ridge alpha={result['metrics']['best_alpha_ridge']:.4f}, "
+        f"RMSE={ridge['RMSE']:.4f}, R²={ridge['R²']:.4f}"
+        f"{'' if args.no_publish else ' (published)'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
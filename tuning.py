@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from sklearn.model_selection import KFold
+from sklearn.linear_model import lasso_path
+
+import ridge_cv
+
+
+# =========================
+# HASIL TUNING
+# =========================
+class TuningResult:
+    # Antarmuka mirip GridSearchCV: best_params_, best_score_, cv_results_
+
+    def __init__(self, alphas, fold_scores, fold_times, wall_time):
+        # fold_scores: (n_folds, n_alphas) berisi -MSE validasi
+        self.alphas = np.asarray(alphas)
+        self.fold_scores = fold_scores
+        self.wall_time = wall_time
+
+        mean = fold_scores.mean(axis=0)
+        self.best_index_ = int(np.argmax(mean))
+        self.best_params_ = {"alpha": self.alphas[self.best_index_]}
+        self.best_score_ = float(mean[self.best_index_])
+
+        # Satu path/SVD per fold dipakai semua alpha, jadi waktu per kandidat
+        # adalah waktu fold dibagi rata ke seluruh alpha
+        per_candidate = np.asarray(fold_times) / len(self.alphas)
+
+        results = {
+            "param_alpha": self.alphas,
+            "params": [{"alpha": a} for a in self.alphas],
+            "mean_test_score": mean,
+            "std_test_score": fold_scores.std(axis=0),
+            "rank_test_score": pd.Series(-mean).rank(method="min").astype(int).to_numpy(),
+            "mean_fit_time": np.full(len(self.alphas), per_candidate.mean()),
+        }
+        for i, scores in enumerate(fold_scores):
+            results[f"split{i}_test_score"] = scores
+        self.cv_results_ = results
+
+
+def _folds(X, cv):
+    return list(KFold(n_splits=cv).split(X))
+
+
+# =========================
+# RIDGE: closed form via ridge_cv (satu SVD per fold untuk semua alpha)
+# =========================
+RIDGE_METHODS = ("kfold",) + ridge_cv.LOO_MODES
+
+
+def tune_ridge(X, y, alphas, cv=10, n_jobs=-1, method="kfold"):
+    # method: "kfold" (setara GridSearchCV), "loo" atau "gcv" (satu SVD total)
+    if method not in RIDGE_METHODS:
+        raise ValueError(f"method tidak dikenal: {method!r} (pilihan: {', '.join(RIDGE_METHODS)})")
+    alphas = np.asarray(alphas, dtype=np.float64)
+
+    start = time.perf_counter()
+    if method == "kfold":
+        mse, fold_times = ridge_cv.kfold_mse(X, y, alphas, cv=cv, n_jobs=n_jobs)
+    else:
+        mse = ridge_cv.loo_mse(X, y, alphas, mode=method)[None, :]
+        fold_times = [time.perf_counter() - start]
+    wall_time = time.perf_counter() - start
+
+    return TuningResult(alphas, -mse, fold_times, wall_time)
+
+
+# =========================
+# LASSO: coordinate descent dengan warm start sepanjang path alpha
+# =========================
+def _lasso_fold(X, y, train_idx, val_idx, alphas, max_iter):
+    start = time.perf_counter()
+    X_tr, y_tr = X[train_idx], y[train_idx]
+    x_mean, y_mean = X_tr.mean(axis=0), y_tr.mean()
+
+    # lasso_path berjalan dari alpha terbesar ke terkecil, setiap solusi
+    # menjadi titik awal alpha berikutnya
+    order = np.argsort(alphas)[::-1]
+    _, coefs, _ = lasso_path(
+        X_tr - x_mean, y_tr - y_mean, alphas=alphas[order], max_iter=max_iter
+    )
+
+    pred = (X[val_idx] - x_mean) @ coefs + y_mean
+    mse = np.empty(len(alphas))
+    mse[order] = ((pred - y[val_idx][:, None]) ** 2).mean(axis=0)
+    return -mse, time.perf_counter() - start
+
+
+def tune_lasso(X, y, alphas, cv=10, max_iter=5000, n_jobs=-1):
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    alphas = np.asarray(alphas, dtype=np.float64)
+
+    start = time.perf_counter()
+    out = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_lasso_fold)(X, y, tr, va, alphas, max_iter) for tr, va in _folds(X, cv)
+    )
+    wall_time = time.perf_counter() - start
+
+    return TuningResult(alphas, np.array([o[0] for o in out]), [o[1] for o in out], wall_time)
@@ -0,0 +1,129 @@
+import argparse
+
+import numpy as np
+from scipy.linalg import solve_triangular
+
+
+# =========================
+# VECTORIZED VIF
+# =========================
+# VIF_j = 1 / (1 - R_j^2), dengan R_j^2 dari regresi kolom j terhadap kolom lain.
+# Semua VIF didapat dari diagonal invers matriks Gram:
+#   centered=True  : G = matriks korelasi -> VIF_j = (R^-1)_jj
+#                    (sama dengan statsmodels.variance_inflation_factor, standardize=True)
+#   centered=False : G = X^T X (regresi tanpa intercept, sama dengan
+#                    statsmodels standardize=False / versi lama pada X tanpa konstanta)
+#                    -> VIF_j = G_jj * (G^-1)_jj
+# Cukup satu faktorisasi Cholesky O(p^3), bukan p regresi OLS.
+#
+# Kasus degenerate (mengikuti statsmodels):
+#   - kolom tanpa variansi (mis. quality konstan setelah filter IQR di partisi
+#     kecil): centered -> VIF 1 (tidak menjelaskan kolom lain),
+#     centered=False dengan kolom nol -> NaN; kolom lain dihitung tanpa kolom itu
+#   - kolinear sempurna: hanya kolom yang kolinear yang menjadi inf
+ZERO_VARIANCE_TOL = 1e-20
+COLLINEAR_TOL = 1e-12
+
+
+def _collinear_diagonal(G):
+    # Fallback saat G singular: R_j^2 per kolom lewat pinv dari Gram kolom lain
+    # (O(p^4), hanya dipakai jika Cholesky gagal). G sudah berdiagonal 1.
+    p = len(G)
+    result = np.empty(p)
+    for j in range(p):
+        rest = np.arange(p) != j
+        g = G[rest, j]
+        r_sq = g @ np.linalg.pinv(G[np.ix_(rest, rest)], rcond=1e-10, hermitian=True) @ g
+        result[j] = np.inf if 1 - r_sq <= COLLINEAR_TOL else 1 / (1 - r_sq)
+    return result
+
+
+def _inverse_diagonal(G):
+    try:
+        L = np.linalg.cholesky(G)
+    except np.linalg.LinAlgError:
+        return _collinear_diagonal(G)
+
+    # G^-1 = L^-T L^-1  ->  diag(G^-1)_j = sum_i (L^-1)_ij^2
+    L_inv = solve_triangular(L, np.eye(len(G)), lower=True)
+    return (L_inv ** 2).sum(axis=0)
+
+
+def vif_from_gram(G, centered=True):
+    # G = Xc^T Xc (centered, mis. co-moment M2 dari feature store) atau X^T X
+    G = np.asarray(G, dtype=np.float64)
+    diag = np.diag(G)
+    valid = diag > ZERO_VARIANCE_TOL * max(diag.max(initial=0.0), 1.0)
+
+    if valid.all():
+        # Jalur umum: tanpa salinan submatriks
+        scale = np.sqrt(diag)
+        return _inverse_diagonal(G / np.outer(scale, scale))
+
+    vifs = np.full(len(G), 1.0 if centered else np.nan)
+    if valid.any():
+        # Normalisasi ke diagonal 1 (untuk centered = matriks korelasi)
+        scale = np.sqrt(diag[valid])
+        vifs[valid] = _inverse_diagonal(G[np.ix_(valid, valid)] / np.outer(scale, scale))
+    return vifs
+
+
+def variance_inflation_factors(X, centered=True):
+    X = np.asarray(X, dtype=np.float64)
+
+    if centered:
+        Xc = X - X.mean(axis=0)
+        return vif_from_gram(Xc.T @ Xc, centered=True)
+    return vif_from_gram(X.T @ X, centered=False)
+
+
+# =========================
+# CEK KESETARAAN DENGAN STATSMODELS
+# =========================
+def check_statsmodels(n_rows=360, seed=0):
+    # statsmodels tidak ada di requirements.txt; hanya untuk verifikasi manual
+    import warnings
+    from statsmodels.stats.outliers_influence import variance_inflation_factor
+
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n_rows, 5))
+
+    constant = base.copy()
+    constant[:, 1] = 5.0
+
+    collinear = base.copy()
+    collinear[:, 1] = 2 * collinear[:, 0] - 3
+
+    cases = {
+        "acak": (base, True),
+        "acak (uncentered)": (base, False),
+        "kolom konstan": (constant, True),
+        "kolom nol (uncentered)": (np.where(np.arange(5) == 2, 0.0, base), False),
+        "kolinear": (collinear, True),
+    }
+
+    ok = True
+    for name, (X, centered) in cases.items():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = np.array([
+                variance_inflation_factor(X, i, standardize=centered) for i in range(X.shape[1])
+            ])
+        # statsmodels memotong R^2 di 1 - 1e-15 (VIF ~1e15); di sini ditulis inf
+        expected[expected >= 1e14] = np.inf
+        actual = variance_inflation_factors(X, centered=centered)
+        same = np.allclose(actual, expected, rtol=1e-8, equal_nan=True)
+        ok &= same
+        print(f"{name:<24} {'OK' if same else 'BEDA'}  {np.round(actual, 4)}  statsmodels={np.round(expected, 4)}")
+    return ok
+
+
+# python vif.py --check
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VIF vektorisasi")
+    parser.add_argument("--check", action="store_true", help="Bandingkan dengan statsmodels")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if check_statsmodels() else 1)
+    parser.print_help()
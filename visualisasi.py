@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 
+import dataset
+import partitions
+from dashboard_data import load_aggregates, SCATTER_MAX_POINTS
+from figure_cache import cached_figure, figure_key
+from instrumentation import stage
 
-def chart():
+
+def chart(partition=None):
+    partition = partition or partitions.default_partition()
 
     # =========================
     # 🌷 GLOBAL STYLE
@@ -88,8 +96,12 @@ def chart():
     # =========================
     # 📂 LOAD DATA
     # =========================
-    df = pd.read_csv("Wine Quality Dataset.csv")
-    kpi = df["quality"].value_counts().to_dict()
+    with stage("dashboard.load_aggregates"):
+        # Hanya CSV partisi terpilih yang dibaca (agregat di-cache per versi file)
+        agg = load_aggregates(partition.data_path)
+        kpi = agg["quality_counts"]
+        # Figure di-cache per versi dataset + parameter chart (JSON siap kirim)
+        version = dataset.dataset_version(partition.data_path)
 
     # =========================
     # 🎨 COLOR THEME
@@ -104,23 +116,25 @@ def chart():
     # 🧾 HEADER
     # =========================
     st.markdown("<h1>🍷 Wine Quality Dashboard</h1>", unsafe_allow_html=True)
+    source_note = f" — {partition.label}" if partition.labels else ""
     st.markdown(
-        "<div class='subtitle'>Analisis visual kualitas wine berdasarkan karakteristik kimia</div>",
+        f"<div class='subtitle'>Analisis visual kualitas wine berdasarkan karakteristik kimia{source_note}</div>",
         unsafe_allow_html=True
     )
 
     # =========================
     # 📊 KPI SECTION (TANPA INSIGHT)
     # =========================
-    cols = st.columns(6)
-    for col, q in zip(cols, [3, 4, 5, 6, 7, 8]):
-        with col:
-            st.markdown(f"""
-            <div class="kpi-card">
-                <div class="kpi-title">QUALITY {q}</div>
-                <div class="kpi-value">{kpi.get(q, 0)}</div>
-            </div>
-            """, unsafe_allow_html=True)
+    with stage("dashboard.kpi"):
+        cols = st.columns(6)
+        for col, q in zip(cols, [3, 4, 5, 6, 7, 8]):
+            with col:
+                st.markdown(f"""
+                <div class="kpi-card">
+                    <div class="kpi-title">QUALITY {q}</div>
+                    <div class="kpi-value">{kpi.get(q, 0)}</div>
+                </div>
+                """, unsafe_allow_html=True)
 
     # =========================
     # 📈 ROW 1
@@ -129,14 +143,40 @@ def chart():
 
     # ---------- BOXPLOT ----------
     with col1:
-        fig1 = px.box(
-            df, x="quality", y="alcohol",
-            title="Kadar Alkohol Berdasarkan Kualitas Wine",
-            color_discrete_sequence=[WINE_MAIN]
-        )
-        fig1.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-        st.markdown("<div class='glass'>", unsafe_allow_html=True)
-        st.plotly_chart(fig1, use_container_width=True)
+        with stage("dashboard.alcohol_box"):
+            # Boxplot dari statistik yang sudah dihitung (bukan dari semua baris)
+            def build_alcohol_box():
+                box = agg["alcohol_box"]
+                qualities = list(box)
+                fig = go.Figure(go.Box(
+                    x=qualities,
+                    q1=[box[q]["q1"] for q in qualities],
+                    median=[box[q]["median"] for q in qualities],
+                    q3=[box[q]["q3"] for q in qualities],
+                    lowerfence=[box[q]["lowerfence"] for q in qualities],
+                    upperfence=[box[q]["upperfence"] for q in qualities],
+                    marker_color=WINE_MAIN,
+                    showlegend=False
+                ))
+                fig.add_trace(go.Scatter(
+                    x=[q for q in qualities for _ in box[q]["outliers"]],
+                    y=[v for q in qualities for v in box[q]["outliers"]],
+                    mode="markers",
+                    marker_color=WINE_MAIN,
+                    showlegend=False
+                ))
+                fig.update_layout(
+                    title="Kadar Alkohol Berdasarkan Kualitas Wine",
+                    xaxis_title="quality",
+                    yaxis_title="alcohol",
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    plot_bgcolor="rgba(0,0,0,0)"
+                )
+                return fig
+
+            fig1 = cached_figure(figure_key("alcohol_box", version, color=WINE_MAIN), build_alcohol_box)
+            st.markdown("<div class='glass'>", unsafe_allow_html=True)
+            st.plotly_chart(fig1, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("""
@@ -148,14 +188,39 @@ def chart():
 
     # ---------- SCATTER ----------
     with col2:
-        fig2 = px.scatter(
-            df, x="pH", y="quality",
-            title="Hubungan pH terhadap Kualitas Wine",
-            color_discrete_sequence=[WINE_MAIN]
-        )
-        fig2.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-        st.markdown("<div class='glass'>", unsafe_allow_html=True)
-        st.plotly_chart(fig2, use_container_width=True)
+        with stage("dashboard.ph_scatter"):
+            density_mode = agg["rows"] > SCATTER_MAX_POINTS
+
+            def build_ph_scatter():
+                if not density_mode:
+                    fig = px.scatter(
+                        dataset.load_dataset(partition.data_path), x="pH", y="quality",
+                        title="Hubungan pH terhadap Kualitas Wine",
+                        color_discrete_sequence=[WINE_MAIN]
+                    )
+                else:
+                    # Dataset besar: kirim histogram 2D, bukan jutaan titik
+                    density = agg["ph_quality_density"]
+                    fig = go.Figure(go.Heatmap(
+                        x=density["ph_centers"],
+                        y=density["qualities"],
+                        z=density["counts"],
+                        colorscale=["#FADADD", WINE_MAIN],
+                        colorbar_title="Jumlah"
+                    ))
+                    fig.update_layout(
+                        title="Hubungan pH terhadap Kualitas Wine (density)",
+                        xaxis_title="pH",
+                        yaxis_title="quality"
+                    )
+                fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+                return fig
+
+            fig2 = cached_figure(
+                figure_key("ph_scatter", version, color=WINE_MAIN, density=density_mode), build_ph_scatter
+            )
+            st.markdown("<div class='glass'>", unsafe_allow_html=True)
+            st.plotly_chart(fig2, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("""
@@ -168,25 +233,27 @@ def chart():
     # =========================
     # 📉 ROW 2
     # =========================
-    alcohol_bins = pd.cut(
-        df["alcohol"],
-        bins=[0, 9, 11, 13, 20],
-        labels=["Rendah", "Sedang", "Tinggi", "Sangat Tinggi"]
-    )
-    avg_quality = df.groupby(alcohol_bins)["quality"].mean().reset_index()
-
     col3, col4 = st.columns([1, 1.2])
 
     # ---------- BAR ----------
     with col3:
-        fig3 = px.bar(
-            avg_quality, x="alcohol", y="quality",
-            title="Rata-rata Kualitas Wine Berdasarkan Level Alkohol",
-            color_discrete_sequence=[WINE_MAIN]
-        )
-        fig3.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
-        st.markdown("<div class='glass'>", unsafe_allow_html=True)
-        st.plotly_chart(fig3, use_container_width=True)
+        with stage("dashboard.alcohol_bar"):
+            def build_alcohol_bar():
+                avg_quality = pd.DataFrame({
+                    "alcohol": list(agg["alcohol_bin_means"]),
+                    "quality": list(agg["alcohol_bin_means"].values())
+                })
+                fig = px.bar(
+                    avg_quality, x="alcohol", y="quality",
+                    title="Rata-rata Kualitas Wine Berdasarkan Level Alkohol",
+                    color_discrete_sequence=[WINE_MAIN]
+                )
+                fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+                return fig
+
+            fig3 = cached_figure(figure_key("alcohol_bar", version, color=WINE_MAIN), build_alcohol_bar)
+            st.markdown("<div class='glass'>", unsafe_allow_html=True)
+            st.plotly_chart(fig3, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("""
@@ -198,20 +265,25 @@ def chart():
 
     # ---------- PIE ----------
     with col4:
-        qc = df["quality"].value_counts().sort_index()
-        fig4 = px.pie(
-            values=qc.values,
-            names=qc.index,
-            title="Distribusi Kualitas Wine",
-            color_discrete_sequence=WINE_PALETTE
-        )
-        fig4.update_traces(
-            textinfo="percent+label",
-            pull=[0.06 if q == 6 else 0 for q in qc.index]
-        )
-        fig4.update_layout(paper_bgcolor="rgba(0,0,0,0)")
-        st.markdown("<div class='glass'>", unsafe_allow_html=True)
-        st.plotly_chart(fig4, use_container_width=True)
+        with stage("dashboard.quality_pie"):
+            def build_quality_pie():
+                qc = agg["quality_counts"]
+                fig = px.pie(
+                    values=list(qc.values()),
+                    names=list(qc),
+                    title="Distribusi Kualitas Wine",
+                    color_discrete_sequence=WINE_PALETTE
+                )
+                fig.update_traces(
+                    textinfo="percent+label",
+                    pull=[0.06 if q == 6 else 0 for q in qc]
+                )
+                fig.update_layout(paper_bgcolor="rgba(0,0,0,0)")
+                return fig
+
+            fig4 = cached_figure(figure_key("quality_pie", version, palette=WINE_PALETTE), build_quality_pie)
+            st.markdown("<div class='glass'>", unsafe_allow_html=True)
+            st.plotly_chart(fig4, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("""